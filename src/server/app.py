@@ -22,34 +22,48 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 
+import os
 from flask import Flask, request
 from models.zone_list import get_zones
 from models.zone_describe import describe_zone
-from models.criticalservice_list import get_critical_service_list
-from models.criticalservice_describe import describe_service
+from models.criticalservice_list import get_critical_service_list, get_critical_service_list_version
+from models.criticalservice_describe import describe_service, get_service_version
 from models.criticalservice_update import update_critical_services
-from models.criticalservice_status_list import get_critical_services_status
+from models.criticalservice_status_list import get_critical_service_status_list, get_critical_service_status_version
+from models.criticalservice_status_live import (get_critical_service_live_status_list,
+                                                get_critical_service_live_status_version)
+from models.health_events_stream import stream_health_events
+from resources.zone_topology import get_zone_topology_version
+from resources.etag import conditional_get
+from resources.ceph_zones import ceph_staleness_headers
+from resources.json_provider import install_json_provider
+from resources.status_monitor import start_status_monitor
 app = Flask(__name__)
+install_json_provider(app)
 
 # Endpoint to get the list of zones
 @app.route("/zones", methods=["GET"])
+@conditional_get(get_zone_topology_version, ceph_staleness_headers)
 def listZones():
-    return get_zones()
+    return get_zones(request.args)
 
 # Endpoint to describe the zone entered
 @app.route('/zones/<zone_name>', methods=['GET'])
+@conditional_get(lambda zone_name: get_zone_topology_version(), ceph_staleness_headers)
 def desc_zone(zone_name):
-    return describe_zone(zone_name)
+    return describe_zone(zone_name, request.args)
 
 # Endpoint to get the list of critical services
 @app.route('/criticalservices', methods=['GET'])
+@conditional_get(get_critical_service_list_version)
 def listCriticalService():
-    return get_critical_service_list()
+    return get_critical_service_list(request.args)
 
 # Endpoint to describe the critical service entered
 @app.route("/criticalservices/<service_name>", methods=["GET"])
+@conditional_get(get_service_version)
 def describeCriticalService(service_name):
-    return describe_service(service_name)
+    return describe_service(service_name, request.args)
 
 # Endpoint to update the critical services list
 @app.route("/criticalservices", methods=["PATCH"])
@@ -59,9 +73,25 @@ def updateCriticalService():
 
 # Endpoint to get the list of critical services status
 @app.route("/criticalservices/status", methods=["GET"])
+@conditional_get(get_critical_service_status_version)
 def listStatusCrtiticalServices():
-    return get_critical_services_status()
+    return get_critical_service_status_list(request.args)
+
+# Endpoint to compute the live status of all critical services in one pass
+@app.route("/criticalservices/status/live", methods=["GET"])
+@conditional_get(get_critical_service_live_status_version)
+def listLiveStatusCriticalServices():
+    return get_critical_service_live_status_list(request.args)
+
+# Endpoint streaming node, OSD, pod zone and balance changes as Server-Sent Events
+@app.route("/events", methods=["GET"])
+def streamEvents():
+    return stream_health_events()
 
 # Running the Flask app
 if __name__ == "__main__":
+    # The debug reloader runs this again in the serving child process, which has
+    # WERKZEUG_RUN_MAIN set; only that one starts the monitor
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_status_monitor()
     app.run(host="0.0.0.0", port=80, debug=True)
@@ -0,0 +1,226 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Asyncio (ASGI) serving mode of the RRS API.
+
+Serves the same endpoints as app.py on Quart. The Kubernetes and Ceph reads of the zone
+endpoints run concurrently on the event loop, and the remaining endpoints, which read the
+in-memory informer caches, run in worker threads only when they have to fall back to the
+apiserver. Run with `python3 async_app.py` or `hypercorn async_app:app`.
+"""
+
+import os
+import asyncio
+from quart import Quart, request, jsonify, make_response
+from quart.wrappers.response import DataBody
+from hypercorn.config import Config
+from hypercorn.asyncio import serve
+from models.zone_list import map_zones, select_zones
+from models.zone_describe import get_zone_info, ZONE_FIELDS
+from models.criticalservice_list import (list_critical_services, get_critical_service_index,
+                                         get_critical_service_list_version)
+from models.criticalservice_describe import (get_service_info, lookup_service, service_document, iter_service_details,
+                                             get_service_version, STREAM_MIN_PODS)
+from models.criticalservice_update import apply_critical_services_update
+from models.criticalservice_status_list import (list_critical_services_status, get_critical_service_status_index,
+                                                get_critical_service_status_version)
+from models.criticalservice_status_live import (list_critical_services_live_status,
+                                                get_critical_service_live_status_version)
+from models.health_events_stream import (parse_event_request, format_events,
+                                         KEEPALIVE_SECONDS, RETRY_MILLISECONDS)
+from resources.health_events import EVENT_POLL_INTERVAL, get_latest_event_id, wait_for_events
+from resources.zone_topology import get_zone_topology, get_zone_topology_version
+from resources.ceph_zones import ceph_staleness_headers
+from resources.async_upstream import get_k8s_zone_state_async, get_ceph_zone_state_async
+from resources.etag import compute_etag, cached_response, carries_error, not_modified
+from resources.response_cache import get_response_cache, cache_key
+from resources.pagination import PaginationError, parse_fields
+from resources.error_print import pretty_print_error
+from resources.status_monitor import start_status_monitor
+
+
+app = Quart(__name__)
+
+@app.errorhandler(PaginationError)
+async def pagination_error(e):
+    return jsonify({"error": str(e)}), 400
+
+async def conditional(version_func, render, headers_func=None):
+    """Async counterpart of resources.etag.conditional_get."""
+    try:
+        version = await asyncio.to_thread(version_func)
+    except Exception:
+        version = None
+    if version is None:
+        return await make_response(await render())
+
+    etag = compute_etag(version, request.path, request.args)
+    response = not_modified(app.response_class, etag, request.if_none_match)
+    if response is not None:
+        return response
+
+    cache = get_response_cache()
+    key = cache_key(request.path, request.args)
+    entry = cache.get(key, version)
+    if entry is None:
+        response = await make_response(await render())
+        if response.status_code != 200 or not isinstance(response.response, DataBody):
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        body = await response.get_data()
+        if carries_error(body):
+            return response
+        entry = cache.put(key, version, body, response.mimetype)
+        if entry is None:
+            response.set_etag(etag)
+            return response
+
+    response = cached_response(app.response_class, cache, entry, etag,
+                               request.accept_mimetypes, request.accept_encodings)
+    if headers_func is not None:
+        response.headers.update(headers_func())
+    return response
+
+async def get_topology():
+    """Fetch the k8s and Ceph zone data concurrently and join them."""
+    k8s_state, ceph_state = await asyncio.gather(get_k8s_zone_state_async(), get_ceph_zone_state_async())
+    return get_zone_topology(k8s_state, ceph_state)
+
+# Endpoint to get the list of zones
+@app.route("/zones", methods=["GET"])
+async def listZones():
+    async def render():
+        response = jsonify(select_zones(map_zones(await get_topology()), request.args))
+        response.headers.update(ceph_staleness_headers())
+        return response
+    return await conditional(get_zone_topology_version, render, ceph_staleness_headers)
+
+# Endpoint to describe the zone entered
+@app.route('/zones/<zone_name>', methods=['GET'])
+async def desc_zone(zone_name):
+    async def render():
+        fields = parse_fields(request.args, ZONE_FIELDS)
+        response = jsonify(get_zone_info(zone_name, await get_topology(), fields))
+        response.headers.update(ceph_staleness_headers())
+        return response
+    return await conditional(get_zone_topology_version, render, ceph_staleness_headers)
+
+# Endpoint to get the list of critical services
+@app.route('/criticalservices', methods=['GET'])
+async def listCriticalService():
+    async def render():
+        index = await asyncio.to_thread(get_critical_service_index)
+        return jsonify(list_critical_services(index, request.args))
+    return await conditional(get_critical_service_list_version, render)
+
+# Endpoint to describe the critical service entered
+@app.route("/criticalservices/<service_name>", methods=["GET"])
+async def describeCriticalService(service_name):
+    async def render():
+        try:
+            service_info = await asyncio.to_thread(get_service_info, service_name)
+            if service_info is None:
+                return jsonify({"error": "Service not found"})
+            fields, page, pod_count = await asyncio.to_thread(lookup_service, {service_name: service_info},
+                                                              service_name, request.args)
+        except PaginationError:
+            raise
+        except Exception as e:
+            return jsonify({"error": str(pretty_print_error(e))})
+
+        if page is None or pod_count < STREAM_MIN_PODS:
+            return jsonify(service_document(fields, page))
+
+        async def stream():
+            for chunk in iter_service_details(fields, page, app.json.dumps):
+                yield chunk
+                # Let other requests run between two batches of pods
+                await asyncio.sleep(0)
+        return await make_response(stream(), {"Content-Type": "application/json"})
+    return await conditional(lambda: get_service_version(service_name), render)
+
+# Endpoint to update the critical services list
+@app.route("/criticalservices", methods=["PATCH"])
+async def updateCriticalService():
+    new_data = await request.get_json()
+    result, status = await asyncio.to_thread(apply_critical_services_update, new_data)
+    return jsonify(result), status
+
+# Endpoint to get the list of critical services status
+@app.route("/criticalservices/status", methods=["GET"])
+async def listStatusCrtiticalServices():
+    async def render():
+        index = await asyncio.to_thread(get_critical_service_status_index)
+        return jsonify(list_critical_services_status(index, request.args))
+    return await conditional(get_critical_service_status_version, render)
+
+# Endpoint to compute the live status of all critical services in one pass
+@app.route("/criticalservices/status/live", methods=["GET"])
+async def listLiveStatusCriticalServices():
+    async def render():
+        index = await asyncio.to_thread(get_critical_service_index)
+        return jsonify(await asyncio.to_thread(list_critical_services_live_status, index, request.args))
+    return await conditional(get_critical_service_live_status_version, render)
+
+# Endpoint streaming node, OSD, pod zone and balance changes as Server-Sent Events
+@app.route("/events", methods=["GET"])
+async def streamEvents():
+    last_id, types, error = parse_event_request(request.headers, request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    async def stream():
+        # Poll the broker without blocking, so a connected client does not hold a thread
+        nonlocal last_id
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        if last_id is None:
+            last_id = get_latest_event_id()
+        idle = 0
+        while True:
+            events = wait_for_events(last_id, 0)
+            if events:
+                idle = 0
+                last_id = events[-1]["id"]
+                chunk = format_events(events, types)
+                if chunk:
+                    yield chunk
+            elif idle >= KEEPALIVE_SECONDS:
+                idle = 0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+            idle += EVENT_POLL_INTERVAL
+
+    response = await make_response(stream(), {"Content-Type": "text/event-stream",
+                                              "Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.timeout = None
+    return response
+
+# Running the ASGI app
+if __name__ == "__main__":
+    start_status_monitor()
+    config = Config()
+    config.bind = [f"0.0.0.0:{os.environ.get('RRS_PORT', '80')}"]
+    asyncio.run(serve(app, config))
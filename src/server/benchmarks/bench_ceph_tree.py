@@ -0,0 +1,115 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Benchmark build_ceph_zones() against the previous nested-scan implementation.
+
+Generates synthetic `ceph osd tree` / `ceph orch host ls` JSON for 10, 100 and 1000
+storage hosts and times both implementations on it:
+
+    python3 benchmarks/bench_ceph_tree.py [--osds-per-host N] [--racks N] [--repeat N]
+"""
+
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resources.ceph_zones import build_ceph_zones
+
+HOST_COUNTS = [10, 100, 1000]
+
+def generate_osd_tree(hosts, osds_per_host, racks):
+    """Build synthetic osd tree and host ls output with hosts spread over racks."""
+    nodes = [{"id": -1, "name": "default", "type": "root", "children": []}]
+    ceph_hosts = []
+    next_id = -2
+    osd_id = 0
+    rack_nodes = []
+
+    for rack in range(racks):
+        rack_node = {"id": next_id, "name": f"x{3000 + rack}", "type": "rack", "children": []}
+        next_id -= 1
+        nodes[0]["children"].append(rack_node["id"])
+        nodes.append(rack_node)
+        rack_nodes.append(rack_node)
+
+    for host in range(hosts):
+        host_name = f"ncn-s{host + 1:03d}"
+        host_node = {"id": next_id, "name": host_name, "type": "host", "children": []}
+        next_id -= 1
+        rack_nodes[host % racks]["children"].append(host_node["id"])
+        nodes.append(host_node)
+        for _ in range(osds_per_host):
+            host_node["children"].append(osd_id)
+            nodes.append({"id": osd_id, "name": f"osd.{osd_id}", "type": "osd",
+                          "status": "up" if osd_id % 50 else "down"})
+            osd_id += 1
+        ceph_hosts.append({"hostname": host_name, "status": "" if host % 7 else "offline"})
+
+    return {"nodes": nodes, "stray": []}, ceph_hosts
+
+def nested_scan_ceph_zones(ceph_tree, ceph_hosts):
+    """Previous implementation: scans every node for each rack child and each host's OSDs."""
+    host_status_map = {host["hostname"]: host["status"] for host in ceph_hosts}
+    zones = {}
+    for item in ceph_tree.get('nodes', []):
+        if item['type'] == 'rack':
+            storage_nodes = []
+            for child_id in item.get('children', []):
+                host_node = next((x for x in ceph_tree['nodes'] if x['id'] == child_id), None)
+                if host_node and host_node['type'] == 'host' and host_node['name'].startswith("ncn-s"):
+                    osd_ids = host_node.get('children', [])
+                    osds = [osd for osd in ceph_tree['nodes'] if osd['id'] in osd_ids and osd['type'] == 'osd']
+                    osd_status_list = [{"name": osd['name'], "status": osd.get('status', 'unknown')} for osd in osds]
+                    node_status = host_status_map.get(host_node['name'], "No Status")
+                    if node_status in ["", "online"]:
+                        node_status = "Ready"
+                    storage_nodes.append({"name": host_node['name'], "status": node_status, "osds": osd_status_list})
+            zones[item['name']] = storage_nodes
+    return zones
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--osds-per-host", type=int, default=8)
+    parser.add_argument("--racks", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'hosts':>6} {'osds':>6} {'indexed (ms)':>14} {'nested scan (ms)':>18}")
+    for hosts in HOST_COUNTS:
+        ceph_tree, ceph_hosts = generate_osd_tree(hosts, args.osds_per_host, args.racks)
+        if build_ceph_zones(ceph_tree, ceph_hosts) != nested_scan_ceph_zones(ceph_tree, ceph_hosts):
+            sys.exit(f"Result mismatch at {hosts} hosts")
+
+        indexed = min(timeit.repeat(lambda: build_ceph_zones(ceph_tree, ceph_hosts),
+                                    number=1, repeat=args.repeat))
+        nested = min(timeit.repeat(lambda: nested_scan_ceph_zones(ceph_tree, ceph_hosts),
+                                   number=1, repeat=args.repeat))
+        print(f"{hosts:>6} {hosts * args.osds_per_host:>6} {indexed * 1000:>14.2f} {nested * 1000:>18.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""Benchmark the raw-JSON list path against kubernetes-client model deserialization.
+
+Generates a synthetic pod list (5000 pods by default) and node list, serves them page by
+page from a fake list call, and times reducing them to records both ways: through the
+client's V1PodList/V1NodeList models (list_in_chunks + pod_record/node_record) and
+through the raw JSON (list_raw_in_chunks + raw_pod_record/raw_node_record):
+
+    python3 benchmarks/bench_raw_lists.py [--pods N] [--nodes N] [--page-size N] [--repeat N]
+"""
+
+import os
+import sys
+import json
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kubernetes.client import ApiClient
+from resources.k8s_zones import ZONE_LABEL, node_record, raw_node_record
+from resources.pod_informer import pod_record, raw_pod_record
+from resources.pagination import list_in_chunks, list_raw_in_chunks
+
+class RawResponse:
+    """Stands in for the urllib3 response returned with _preload_content=False."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def release_conn(self):
+        pass
+
+def generate_nodes(count):
+    """Build a node list with the labels and conditions of a real node."""
+    return [
+        {
+            "metadata": {"name": f"ncn-w{i + 1:03d}", "uid": f"node-{i}", "resourceVersion": str(i),
+                         "labels": {ZONE_LABEL: f"x{3000 + i % 4}", "kubernetes.io/hostname": f"ncn-w{i + 1:03d}",
+                                    "kubernetes.io/os": "linux", "node-role.kubernetes.io/worker": ""},
+                         "annotations": {"node.alpha.kubernetes.io/ttl": "0"}},
+            "spec": {"podCIDR": f"10.32.{i % 256}.0/24"},
+            "status": {"conditions": [{"type": kind, "status": "False", "reason": "Fine",
+                                       "lastHeartbeatTime": "2025-01-01T00:00:00Z",
+                                       "lastTransitionTime": "2025-01-01T00:00:00Z"}
+                                      for kind in ("MemoryPressure", "DiskPressure", "PIDPressure")]
+                       + [{"type": "Ready", "status": "True", "reason": "KubeletReady",
+                           "lastHeartbeatTime": "2025-01-01T00:00:00Z",
+                           "lastTransitionTime": "2025-01-01T00:00:00Z"}],
+                       "nodeInfo": {"kubeletVersion": "v1.30.0", "osImage": "SLES", "architecture": "amd64",
+                                    "bootID": "b", "containerRuntimeVersion": "containerd", "kernelVersion": "6",
+                                    "kubeProxyVersion": "v1.30.0", "machineID": "m", "operatingSystem": "linux",
+                                    "systemUUID": "s"}}
+        }
+        for i in range(count)
+    ]
+
+def generate_pods(count, nodes):
+    """Build a pod list with owner references, containers and statuses like real pods."""
+    pods = []
+    for i in range(count):
+        workload = f"service-{i % 50}"
+        pods.append({
+            "metadata": {"name": f"{workload}-6d4cf56db6-{i:05d}", "namespace": "services", "uid": f"pod-{i}",
+                         "resourceVersion": str(i), "labels": {"app": workload, "pod-template-hash": "6d4cf56db6"},
+                         "ownerReferences": [{"apiVersion": "apps/v1", "kind": "ReplicaSet", "controller": True,
+                                              "name": f"{workload}-6d4cf56db6", "uid": f"rs-{i % 50}"}]},
+            "spec": {"nodeName": f"ncn-w{i % nodes + 1:03d}", "serviceAccountName": "default",
+                     "containers": [{"name": workload, "image": f"registry/{workload}:1.0",
+                                     "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+                                     "env": [{"name": "LOG_LEVEL", "value": "INFO"}],
+                                     "resources": {"limits": {"cpu": "1", "memory": "1Gi"}},
+                                     "volumeMounts": [{"name": "token", "mountPath": "/var/run/secrets"}]}],
+                     "volumes": [{"name": "token", "projected": {"sources": []}}]},
+            "status": {"phase": "Running" if i % 20 else "Pending", "podIP": f"10.32.{i % 256}.{i % 250}",
+                       "conditions": [{"type": "Ready", "status": "True"}],
+                       "containerStatuses": [{"name": workload, "ready": True, "restartCount": 0,
+                                              "image": f"registry/{workload}:1.0", "imageID": "sha256:0",
+                                              "state": {"running": {"startedAt": "2025-01-01T00:00:00Z"}}}]}
+        })
+    return pods
+
+def fake_list(items, kind, page_size):
+    """Return a list call serving the items as JSON pages, like the apiserver does."""
+    api_client = ApiClient()
+    pages = []
+    for start in range(0, len(items), page_size):
+        end = start + page_size
+        metadata = {"resourceVersion": "1"}
+        if end < len(items):
+            metadata["continue"] = str(end)
+        pages.append(json.dumps({"kind": kind, "apiVersion": "v1", "metadata": metadata,
+                                 "items": items[start:end]}).encode())
+
+    def list_func(limit=None, _continue=None, _preload_content=True, **kwargs):
+        data = pages[int(_continue or 0) // page_size]
+        if not _preload_content:
+            return RawResponse(data)
+        return api_client.deserialize(data.decode(), f"V1{kind}", "application/json")
+    return list_func
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pods", type=int, default=5000)
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    list_pods = fake_list(generate_pods(args.pods, args.nodes), "PodList", args.page_size)
+    list_nodes = fake_list(generate_nodes(args.nodes), "NodeList", args.page_size)
+    cases = [
+        ("pods", args.pods,
+         lambda: [pod_record(pod) for pod in list_in_chunks(list_pods, limit=args.page_size)],
+         lambda: [raw_pod_record(pod) for pod in list_raw_in_chunks(list_pods, limit=args.page_size)]),
+        ("nodes", args.nodes,
+         lambda: [node_record(node) for node in list_in_chunks(list_nodes, limit=args.page_size)],
+         lambda: [raw_node_record(node) for node in list_raw_in_chunks(list_nodes, limit=args.page_size)]),
+    ]
+
+    print(f"{'list':>6} {'items':>6} {'models (ms)':>12} {'raw JSON (ms)':>14} {'speedup':>8}")
+    for name, count, models, raw in cases:
+        if models() != raw():
+            sys.exit(f"Record mismatch in the {name} list")
+        models_time = min(timeit.repeat(models, number=1, repeat=args.repeat))
+        raw_time = min(timeit.repeat(raw, number=1, repeat=args.repeat))
+        print(f"{name:>6} {count:>6} {models_time * 1000:>12.1f} {raw_time * 1000:>14.1f} "
+              f"{models_time / raw_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
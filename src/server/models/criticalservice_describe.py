@@ -22,59 +22,134 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 
-from flask import jsonify
+import os
+from flask import Response, current_app, jsonify, stream_with_context
 from resources.critical_services import *
 from kubernetes import client
 from resources.error_print import pretty_print_error
+from resources.service_registry import get_registry_version, get_registry_service
+from resources.pod_informer import get_pod_index_version
+from resources.k8s_zones import get_k8s_zone_version
+from resources.workload_informer import get_workload_version
+from resources.pagination import PaginationError, PageIterator, matches, parse_fields, with_continue
 
 cm_name = "rrs-mon-static"
 cm_namespace = "rack-resiliency"
 cm_key = "critical-service-config.json"
 
-def get_service_details(services, service_name):
-    """Retrieve details of a specific critical service."""
+POD_FILTERS = ("zone", "status")
+STREAM_MIN_PODS = int(os.environ.get("RRS_STREAM_MIN_PODS", "1000"))
+STREAM_BATCH_PODS = 100
+SERVICE_FIELDS = ("Name", "Namespace", "Type", "Configured Instances", "Currently Running Instances", "Pods")
+
+def lookup_service(services, service_name, args):
+    """Read everything a service description needs except the pods themselves.
+
+    Returns (fields of the description without "Pods", lazy page of the pods filtered on
+    zone and status or None if they were not selected, number of pods of the service
+    before filtering). The workload is only read for "Configured Instances", and the
+    pods only for "Pods" and "Currently Running Instances".
+    """
+    selected = parse_fields(args, SERVICE_FIELDS)
+
+    # Getting information of service
+    service_info = services[service_name]
+    namespace = service_info["namespace"]
+    resource_type = service_info["type"]
+    fields = {"Name": service_name, "Namespace": namespace, "Type": resource_type}
+
+    # Get all pods in the namespace and filter by owner reference
+    pods, pod_count, workload = None, 0, None
+    if "Pods" in selected or "Currently Running Instances" in selected:
+        pods, fields["Currently Running Instances"], pod_count, workload = get_namespaced_pod_iter(service_info, service_name)
+
+    # Get configured instances
+    if "Configured Instances" in selected:
+        fields["Configured Instances"] = get_configured_instance(namespace, resource_type, service_name, workload)
+
+    fields = {key: value for key, value in fields.items() if key in selected}
+    if "Pods" not in selected:
+        return fields, None, pod_count
+    pods = (pod for pod in pods if matches({"zone": pod["Zone"], "status": pod["Status"]}, args, POD_FILTERS))
+    return fields, PageIterator(pods, lambda pod: (pod["Name"],), args), pod_count
+
+def service_document(fields, page):
+    """Build the description of a service, reading the whole page of pods if they were selected."""
+    if page is None:
+        return {"Critical Service": fields}
+    return with_continue({"Critical Service": dict(fields, Pods=list(page))}, page.token)
+
+def get_service_details(services, service_name, args=None):
+    """Retrieve details of a specific critical service, with the pods filtered on zone and
+    status and paginated by the query parameters."""
     try:
         if service_name not in services:
             return {"error": "Service not found"}
-        
-        # Getting information of service
-        service_info = services[service_name]
-        namespace = service_info["namespace"]
-        resource_type = service_info["type"]
-
-        # Get all pods in the namespace and filter by owner reference
-        filtered_pods, running_pods = get_namespaced_pods(service_info, service_name)
-
-        # Get configured instances
-        apps_v1 = client.AppsV1Api()
-        configured_instances = None
-        if resource_type == "Deployment":
-            deployment = apps_v1.read_namespaced_deployment(service_name, namespace)
-            configured_instances = deployment.spec.replicas
-        elif resource_type == "StatefulSet":
-            statefulset = apps_v1.read_namespaced_stateful_set(service_name, namespace)
-            configured_instances = statefulset.spec.replicas
-        elif resource_type == "DaemonSet":
-            daemonset = apps_v1.read_namespaced_daemon_set(service_name, namespace)
-            configured_instances = daemonset.status.desired_number_scheduled
-
-        return {
-            "Critical Service": {
-                "Name": service_name,
-                "Namespace": namespace,
-                "Type": resource_type,
-                "Configured Instances": configured_instances,
-                "Currently Running Instances": running_pods, 
-                "Pods": filtered_pods
-            }
-        }
+        return service_document(*lookup_service(services, service_name, args or {})[:2])
+    except PaginationError:
+        raise
     except Exception as e:
         return {"error": str(pretty_print_error(e))}
 
-def describe_service(service_name):
-    """Returning the response in JSON Format"""
+def iter_service_details(fields, page, dumps):
+    """Yield the JSON of a service description, encoding the pods in small batches as they
+    are read. Keys are sorted like jsonify sorts them."""
+    before = [key for key in sorted(fields) if key < "Pods"]
+    after = [key for key in sorted(fields) if key > "Pods"]
+    yield '{"Critical Service": {' + "".join(f"{dumps(key)}: {dumps(fields[key])}, " for key in before) + '"Pods": ['
+
+    batch = []
+    separator = ""
+    for pod in page:
+        batch.append(dumps(pod))
+        if len(batch) == STREAM_BATCH_PODS:
+            yield separator + ", ".join(batch)
+            batch, separator = [], ", "
+    if batch:
+        yield separator + ", ".join(batch)
+
+    yield "]" + "".join(f", {dumps(key)}: {dumps(fields[key])}" for key in after) + "}"
+    if page.token:
+        yield f', "continue": {dumps(page.token)}'
+    yield "}\n"
+
+
+def get_service_info(service_name):
+    """Registry entry of a service, read from its own shard of a sharded registry."""
+    return get_registry_service(cm_name, cm_namespace, cm_key, service_name)
+
+def get_service_version(service_name):
+    """Data version of a service description: the rrs-mon-static, pod, node and workload
+    resourceVersions."""
+    config_version = get_registry_version(cm_name, cm_namespace, cm_key)
+    if config_version is None:
+        return None
+    service_info = get_service_info(service_name)
+    if service_info is None:
+        return (config_version,)
+    namespace = service_info["namespace"]
+    versions = (config_version, get_pod_index_version(namespace), get_k8s_zone_version(),
+                get_workload_version(namespace, (service_info["type"],)))
+    return None if None in versions else versions
+
+def describe_service(service_name, args):
+    """Returning the response in JSON Format; services with many pods are streamed."""
     try:
-        services = get_configmap(cm_name, cm_namespace, cm_key).get("critical-services", {})
-        return jsonify(get_service_details(services, service_name))
+        service_info = get_service_info(service_name)
+        if service_info is None:
+            return jsonify({"error": "Service not found"})
+        try:
+            fields, page, pod_count = lookup_service({service_name: service_info}, service_name, args)
+        except PaginationError:
+            raise
+        except Exception as e:
+            return jsonify({"error": str(pretty_print_error(e))})
+
+        if page is None or pod_count < STREAM_MIN_PODS:
+            return jsonify(service_document(fields, page))
+        return Response(stream_with_context(iter_service_details(fields, page, current_app.json.dumps)),
+                        mimetype="application/json")
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return {"error": str(pretty_print_error(e))}
\ No newline at end of file
@@ -23,35 +23,47 @@
 #
 
 from flask import jsonify
-from resources.critical_services import get_configmap
+from resources.service_registry import get_registry_version
+from resources.service_index import ServiceIndex, get_service_index
 from resources.error_print import pretty_print_error
+from resources.pagination import PaginationError, with_continue
 
 cm_name = "rrs-mon-static"
 cm_namespace = "rack-resiliency"
 cm_key = "critical-service-config.json"
 
+LIST_FILTERS = ("namespace", "type")
+
+def service_row(name, details):
+    """Entry of a service in the list."""
+    return {
+        "name": name,
+        "type": details["type"]
+    }
+
 def get_critical_services(services):
     """Fetch and format critical services grouped by namespace in the required structure."""
-    try:
-        result = {"namespace": {}}
-        for name, details in services.items():
-            namespace = details["namespace"]
-            if namespace not in result["namespace"]:
-                result["namespace"][namespace] = []
-            result["namespace"][namespace].append({
-                "name": name,
-                "type": details["type"]
-            })
-
-        return result
-    except Exception as e:
-        return {"error": str(pretty_print_error(e))}
+    return ServiceIndex(services, service_row, LIST_FILTERS).view
+
+def get_critical_service_index():
+    """Compiled registry of rrs-mon-static with the prebuilt list view."""
+    return get_service_index(cm_name, cm_namespace, cm_key, service_row, LIST_FILTERS)
+
+def get_critical_service_list_version():
+    """Data version of the service list: the rrs-mon-static resourceVersion."""
+    return get_registry_version(cm_name, cm_namespace, cm_key)
+
+def list_critical_services(index, args):
+    """Filtered page of the critical services, with the continue token of the next page."""
+    view, token = index.select(args)
+    return with_continue({"critical-services": view}, token)
 
-def get_critical_service_list():
+def get_critical_service_list(args):
     """Returning the response in JSON Format"""
     try:
-        services = get_configmap(cm_name, cm_namespace, cm_key).get("critical-services", {})
-        return jsonify({"critical-services": get_critical_services(services)})
+        return jsonify(list_critical_services(get_critical_service_index(), args))
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return {"error": str(pretty_print_error(e))}
 
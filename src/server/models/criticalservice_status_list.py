@@ -22,38 +22,75 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 
+import threading
 from flask import jsonify
-from resources.critical_services import get_configmap
+from resources.service_registry import get_registry_version
+from resources.service_index import ServiceIndex, get_service_index
+from resources.zone_balance import get_balance_version, with_live_balance
 from resources.error_print import pretty_print_error
+from resources.pagination import PaginationError, with_continue
 
 cm_name = "rrs-mon-dynamic"
 cm_namespace = "rack-resiliency"
 cm_key = "critical-service-config.json"
 
+STATUS_FILTERS = ("namespace", "type", "status", "balanced")
+
+_live_index = None
+_live_index_lock = threading.Lock()
+
+def status_row(name, details):
+    """Entry of a service in the status list."""
+    return {
+        "name": name,
+        "type": details["type"],
+        "status": details["status"],
+        "balanced": details["balanced"],
+        "min_replicas_per_zone": details.get("min_replicas_per_zone"),
+        "single_zone_risk": details.get("single_zone_risk")
+    }
+
 def get_critical_services_status(services):
     """Fetch and format critical services grouped by namespace in the required structure."""
-    try:
-        result = {"namespace": {}}
-        for name, details in services.items():
-            namespace = details["namespace"]
-            if namespace not in result["namespace"]:
-                result["namespace"][namespace] = []
-            result["namespace"][namespace].append({
-                "name": name,
-                "type": details["type"],
-                "status": details["status"],
-                "balanced": details["balanced"]
-            })
-
-        return result
-    except Exception as e:
-        return {"error": str(pretty_print_error(e))}
+    return ServiceIndex(services, status_row, STATUS_FILTERS).view
+
+def get_critical_service_status_index():
+    """Compiled registry of rrs-mon-dynamic with the balance of the services read live and
+    the prebuilt status view, rebuilt only when the registry, a node or a pod changed."""
+    global _live_index
+    registry = get_service_index(cm_name, cm_namespace, cm_key, status_row, STATUS_FILTERS)
+    version = get_balance_version(registry.namespaces)
+    with _live_index_lock:
+        cached = _live_index
+    if version is not None and cached is not None and cached[0] is registry and cached[1] == version:
+        return cached[2]
+    index = ServiceIndex(with_live_balance(registry.services), status_row, STATUS_FILTERS)
+    if version is not None:
+        with _live_index_lock:
+            _live_index = (registry, version, index)
+    return index
+
+def get_critical_service_status_version():
+    """Data version of the status list: the rrs-mon-dynamic, node and per-namespace pod
+    resourceVersions."""
+    config_version = get_registry_version(cm_name, cm_namespace, cm_key)
+    if config_version is None:
+        return None
+    namespaces = get_service_index(cm_name, cm_namespace, cm_key, status_row, STATUS_FILTERS).namespaces
+    balance_version = get_balance_version(namespaces)
+    return None if balance_version is None else (config_version,) + balance_version
+
+def list_critical_services_status(index, args):
+    """Filtered page of the critical services status, with the continue token of the next page."""
+    view, token = index.select(args)
+    return with_continue({"critical-services": view}, token)
 
-def get_critical_service_list():
+def get_critical_service_status_list(args):
     """Returning the response in JSON Format"""
     try:
-        services = get_configmap(cm_name, cm_namespace, cm_key).get("critical-services", {})
-        return jsonify({"critical-services": get_critical_services_status(services)})
+        return jsonify(list_critical_services_status(get_critical_service_status_index(), args))
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return {"error": str(pretty_print_error(e))}
 
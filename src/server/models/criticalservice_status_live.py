@@ -0,0 +1,118 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import concurrent.futures
+from flask import jsonify
+from resources.critical_services import get_namespace_workload_counts_live, get_configured_instances
+from resources.k8s_zones import get_k8s_nodes_data, get_k8s_zone_version
+from resources.service_registry import get_registry_version
+from resources.pod_informer import get_pod_index_version
+from resources.workload_informer import get_workload_version
+from resources.error_print import pretty_print_error
+from resources.pagination import PaginationError, with_continue
+from models.criticalservice_list import get_critical_service_index
+
+cm_name = "rrs-mon-static"
+cm_namespace = "rack-resiliency"
+cm_key = "critical-service-config.json"
+
+MAX_PARALLEL_NAMESPACES = 8
+
+def get_namespace_status(namespace, services, node_zone_map):
+    """Compute configured vs running instances and the zone distribution of all services
+    of one namespace, with one pod lookup and one workload list per type."""
+    workload_counts = get_namespace_workload_counts_live(namespace, node_zone_map)
+    configured = get_configured_instances(namespace, {details["type"] for details in services.values()})
+
+    result = []
+    for name, details in services.items():
+        key = (details["type"], name)
+        running, zone_counts = workload_counts.get(key, (0, {}))
+        result.append({
+            "name": name,
+            "type": details["type"],
+            "configured_instances": configured.get(key),
+            "running_instances": running,
+            "zone_distribution": zone_counts
+        })
+    return result
+
+def get_critical_services_live_status(services):
+    """Compute the live status of every critical service, grouped by namespace."""
+    try:
+        nodes_data = get_k8s_nodes_data()
+        if isinstance(nodes_data, dict) and "error" in nodes_data:
+            return {"error": nodes_data["error"]}
+        node_zone_map = {} if isinstance(nodes_data, str) else {
+            node["name"]: zone
+            for zone, node_types in nodes_data.items()
+            for node_type in ["masters", "workers"]
+            for node in node_types[node_type]
+        }
+
+        by_namespace = {}
+        for name, details in services.items():
+            by_namespace.setdefault(details["namespace"], {})[name] = details
+
+        result = {"namespace": {}}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_NAMESPACES) as executor:
+            futures = {
+                namespace: executor.submit(get_namespace_status, namespace, namespace_services, node_zone_map)
+                for namespace, namespace_services in by_namespace.items()
+            }
+            for namespace, future in futures.items():
+                result["namespace"][namespace] = future.result()
+
+        return result
+    except Exception as e:
+        return {"error": str(pretty_print_error(e))}
+
+def get_critical_service_live_status_version():
+    """Data version of the live status: the rrs-mon-static, node, and per-namespace pod and
+    workload resourceVersions."""
+    config_version = get_registry_version(cm_name, cm_namespace, cm_key)
+    if config_version is None:
+        return None
+    index = get_critical_service_index()
+    types = tuple(index.by_field["type"])
+    versions = (config_version, get_k8s_zone_version())
+    for namespace in index.namespaces:
+        versions += (get_pod_index_version(namespace), get_workload_version(namespace, types))
+    return None if None in versions else versions
+
+def list_critical_services_live_status(index, args):
+    """Live status of a filtered page of the critical services; only that page is computed.
+    The index is the one of the service list, which has the same registry and filters."""
+    page, token = index.select_services(args)
+    return with_continue({"critical-services": get_critical_services_live_status(page)}, token)
+
+def get_critical_service_live_status_list(args):
+    """Returning the response in JSON Format"""
+    try:
+        return jsonify(list_critical_services_live_status(get_critical_service_index(), args))
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return {"error": str(pretty_print_error(e))}
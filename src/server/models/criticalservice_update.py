@@ -27,6 +27,7 @@ from flask import jsonify
 from kubernetes import client
 from resources.critical_services import *
 from resources.error_print import pretty_print_error
+from resources.configmap_writer import get_configmap_writer
 
 cm_name = "rrs-mon-static"
 cm_namespace = "rack-resiliency"
@@ -50,85 +51,43 @@ cm_key = "critical-service-config.json"
 #     except Exception as e:
 #         return {"error": str(e)} 
 
-def update_configmap(new_data, existing_data, test=False):
-    """Update the ConfigMap in the Kubernetes cluster with the merged data."""
-    try:
-        v1 = client.CoreV1Api()
-        # Fetch the existing ConfigMap data
-        # existing_data = get_configmap()
-        if "error" in existing_data:
-            return existing_data
-        
-        # Merge the existing and new data
-        existing_services = existing_data.get("critical-services", {})
-        new_services = json.loads(new_data)
-
-        # Merge new services, checking for duplicates
-        added_services = []
-        skipped_services = []
-        # non_existing_services = []
-        for service_name, details in new_services["critical-services"].items():
-            if service_name in existing_services:
-                skipped_services.append(service_name)
-            else:
-                # if serviceExist(service_name, new_services["critical-services"]):
-                    existing_services[service_name] = details
-                    added_services.append(service_name)
-                # else:
-                    # non_existing_services.append(service_name)
-
-        # Convert back to JSON string for ConfigMap storage
-        updated_json_str = json.dumps({"critical-services": existing_services}, indent=2)
+def update_configmap(new_services):
+    """Add the new services to the ConfigMap, skipping the ones that already exist.
 
-        # Patch the ConfigMap with the updated data
-        body = {"data": {cm_key: updated_json_str}}
-        
-        # Added the condition for CI testcase
-        if not(test):
-            v1.patch_namespaced_config_map(cm_name, cm_namespace, body)
-
-        response = {"Update": "Successful"}
+    Concurrent updates are coalesced by the shared writer into one patch of the
+    ConfigMap, guarded by its resourceVersion.
+    """
+    try:
+        return get_configmap_writer(cm_name, cm_namespace, cm_key).submit(new_services["critical-services"])
 
-        if added_services:
-            response["Successfully Added Services"] = added_services
-        if skipped_services:
-            response["Already Existing Services"] = skipped_services
-            if len(added_services) == 0:
-                response["Update"] = "Services Already Exist"
-        # if non_existing_services:
-        #     response["Unknown Services"] = non_existing_services
-        #     response["Message for unknown services"] = (
-        #         "Service(s) has no associated pods in the namespace, Please verify the Information"
-        #     )
-        # else:
-        #     response["Update"] = "Unsuccessful"
-        return response
+    except client.exceptions.ApiException as e:
+        return {"error": f"Failed to update ConfigMap: {pretty_print_error(str(e))}"}
 
     except Exception as e:
-        return {"error": str(pretty_print_error(e))}
+        return {"error": str(pretty_print_error(str(e)))}
 
-    except client.exceptions.ApiException as e:
-        return {"error": f"Failed to update ConfigMap: {pretty_print_error(e)}"}
-
-def update_critical_services(new_data):
-    """Function to update critical services in the ConfigMap."""
+def apply_critical_services_update(new_data):
+    """Validate the update request and merge it into the ConfigMap, returning (result, HTTP status)."""
     try:
         if not new_data or "from_file" not in new_data:
-            return jsonify({"error": "Invalid request format"}), 400
+            return {"error": "Invalid request format"}, 400
 
         # Parse the nested JSON string inside "services"
         try:
             new_data = new_data.get("from_file")
             new_services = json.loads(new_data)
         except json.JSONDecodeError:
-            return jsonify({"error": "Invalid JSON format in services"}), 400
+            return {"error": "Invalid JSON format in services"}, 400
 
         if "critical-services" not in new_services:
-            return jsonify({"error": "Missing 'critical-services' in payload"}), 400
+            return {"error": "Missing 'critical-services' in payload"}, 400
         
-        existing_data = get_configmap(cm_name, cm_namespace, cm_key)
-        result = update_configmap(new_data, existing_data)
-        return jsonify(result)
+        return update_configmap(new_services), 200
     
     except Exception as e:
-        return jsonify({"error": str(pretty_print_error(e))}), 500
+        return {"error": str(pretty_print_error(e))}, 500
+
+def update_critical_services(new_data):
+    """Function to update critical services in the ConfigMap."""
+    result, status = apply_critical_services_update(new_data)
+    return jsonify(result), status
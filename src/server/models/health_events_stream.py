@@ -0,0 +1,79 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import json
+from flask import Response, jsonify, request, stream_with_context
+from resources.health_events import EVENT_TYPES, get_latest_event_id, wait_for_events
+
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 5000
+
+def parse_event_request(headers, args):
+    """Return (last event id, event types or None for all) of a stream request, or an error."""
+    last_id = headers.get("Last-Event-ID") or args.get("lastEventId")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return None, None, f"Invalid event id: {last_id}"
+
+    types = set(args["types"].split(",")) if args.get("types") else None
+    if types and not types <= set(EVENT_TYPES):
+        return None, None, f"Unknown event types: {', '.join(sorted(types - set(EVENT_TYPES)))}"
+    return last_id, types, None
+
+def format_event(event):
+    """Serialize an event in the text/event-stream format."""
+    data = json.dumps({"time": event["time"], **event["data"]})
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+def format_events(events, types):
+    """Serialize the events a client asked for; resync events are always sent."""
+    return "".join(
+        format_event(event) for event in events
+        if types is None or event["type"] in types or event["type"] == "resync"
+    )
+
+def event_stream(last_id, types):
+    """Yield the events after last_id as they happen, with a comment line as keep-alive."""
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+    if last_id is None:
+        last_id = get_latest_event_id()
+    while True:
+        events = wait_for_events(last_id, KEEPALIVE_SECONDS)
+        if not events:
+            yield ": keep-alive\n\n"
+            continue
+        last_id = events[-1]["id"]
+        chunk = format_events(events, types)
+        if chunk:
+            yield chunk
+
+def stream_health_events():
+    """Returning the event stream response"""
+    last_id, types, error = parse_event_request(request.headers, request.args)
+    if error:
+        return jsonify({"error": error}), 400
+    return Response(stream_with_context(event_stream(last_id, types)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
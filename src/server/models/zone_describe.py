@@ -23,67 +23,68 @@
 #
 
 from flask import jsonify
-from resources.k8sZones import get_k8s_nodes_data
-from resources.cephZones import get_ceph_storage_nodes
-from models.zoneList import zoneExist
+from resources.zone_topology import get_zone_topology
+from resources.ceph_zones import ceph_staleness_headers
+from models.zone_list import zoneExist
+from resources.pagination import PaginationError, parse_fields
 
-def get_zone_info(zone_name,k8s_zones,ceph_zones):
-    """Function to get detailed information of a specific zone."""
-    if isinstance(k8s_zones, dict) and "error" in k8s_zones:
-        return {"error": k8s_zones["error"]}
-    
-    if isinstance(ceph_zones, dict) and "error" in ceph_zones:
-        return {"error": ceph_zones["error"]}
-    
-    if isinstance(k8s_zones, str) or isinstance(ceph_zones, str):
-        return zoneExist(k8s_zones, ceph_zones)
+ZONE_FIELDS = ("Zone Name", "Management Masters", "Management Workers", "Management Storages",
+               "Management Master", "Management Worker", "Management Storage")
 
-    masters = k8s_zones.get(zone_name, {}).get("masters", [])
-    workers = k8s_zones.get(zone_name, {}).get("workers", [])
-    storage = ceph_zones.get(zone_name, [])
+def get_zone_info(zone_name, topology, fields=ZONE_FIELDS):
+    """Function to get detailed information of a specific zone.
+
+    Only the sections named in fields are built, so selecting the counts skips the
+    node and OSD lists.
+    """
+    if topology.error:
+        return {"error": topology.error}
+    
+    if not (topology.k8s_configured and topology.ceph_configured):
+        return zoneExist(topology)
 
-    if not (masters or workers or storage):
+    zone = topology.zones.get(zone_name)
+    if zone is None or not (zone.masters or zone.workers or zone.storage):
         return {"error": "Zone not found"}
 
-    zone_data = {
-        "Zone Name": zone_name,
-        "Management Masters": len(masters),
-        "Management Workers": len(workers),
-        "Management Storages": len(storage)
-    }
+    zone_data = {}
+    if "Zone Name" in fields:
+        zone_data["Zone Name"] = zone_name
+    if "Management Masters" in fields:
+        zone_data["Management Masters"] = len(zone.masters)
+    if "Management Workers" in fields:
+        zone_data["Management Workers"] = len(zone.workers)
+    if "Management Storages" in fields:
+        zone_data["Management Storages"] = len(zone.storage)
 
-    if masters:
+    if zone.masters and "Management Master" in fields:
         zone_data["Management Master"] = {
             "Type": "Kubernetes Topology Zone",
-            "Nodes": [{"Name": node["name"], "Status": node["status"]} for node in masters]
+            "Nodes": [{"Name": name, "Status": status} for name, status in zone.masters]
         }
     
-    if workers:
+    if zone.workers and "Management Worker" in fields:
         zone_data["Management Worker"] = {
             "Type": "Kubernetes Topology Zone",
-            "Nodes": [{"Name": node["name"], "Status": node["status"]} for node in workers]
+            "Nodes": [{"Name": name, "Status": status} for name, status in zone.workers]
         }
     
-    if storage:
+    if zone.storage and "Management Storage" in fields:
         zone_data["Management Storage"] = {
             "Type": "CEPH Zone",
-            "Nodes": []
+            "Nodes": [
+                {"Name": name, "Status": status, "OSDs": {osd_status: list(osds) for osd_status, osds in osd_status_map.items()}}
+                for name, status, osd_status_map in zone.storage
+            ]
         }
-        for node in storage:
-            osd_status_map = {}
-            for osd in node.get("osds", []):
-                osd_status_map.setdefault(osd["status"], []).append(osd["name"])
-            
-            storage_node = {
-                "Name": node["name"],
-                "Status": node["status"],
-                "OSDs": osd_status_map
-            }
-            zone_data["Management Storage"]["Nodes"].append(storage_node)
     
     return zone_data
 
-def describe_zone(zone_name):
-    k8s_zones = get_k8s_nodes_data()
-    ceph_zones = get_ceph_storage_nodes()
-    return jsonify(get_zone_info(zone_name, k8s_zones, ceph_zones))
\ No newline at end of file
+def describe_zone(zone_name, args):
+    try:
+        fields = parse_fields(args, ZONE_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify(get_zone_info(zone_name, get_zone_topology(), fields))
+    response.headers.update(ceph_staleness_headers())
+    return response
\ No newline at end of file
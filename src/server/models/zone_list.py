@@ -22,43 +22,36 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 
-from resources.k8sZones import get_k8s_nodes_data
-from resources.cephZones import get_ceph_storage_nodes
+from resources.zone_topology import get_zone_topology
+from resources.ceph_zones import ceph_staleness_headers
 from flask import jsonify
+from resources.pagination import PaginationError, matches, paginate, with_continue
 
-def zoneExist(k8s_zones, ceph_zones):
+def zoneExist(topology):
     """Function to check if any types of zones(K8s Topology or CEPH) exist"""
-    if isinstance(k8s_zones, str) and isinstance(ceph_zones, str):
+    if not topology.k8s_configured and not topology.ceph_configured:
         return {"Zones": [], "Information": "No zones (K8s topology and Ceph) configured"}
-    if isinstance(k8s_zones, str):
+    if not topology.k8s_configured:
         return {"Zones": [], "Information": "No K8s topology zones configured"}
-    if isinstance(ceph_zones, str):
+    if not topology.ceph_configured:
         return {"Zones": [], "Information": "No CEPH zones configured"}
 
-def get_node_name(node_list):
-    """Extracts node names from a list of node dictionaries."""
-    return [node.get("name") for node in node_list if "name" in node]
-
-def map_zones(k8s_zones, ceph_zones):
+def map_zones(topology):
     """Map Kubernetes and Ceph zones and provide summarized data in the new format."""
-    if isinstance(k8s_zones, dict) and "error" in k8s_zones:
-        return {"error": k8s_zones["error"]}
-    
-    if isinstance(ceph_zones, dict) and "error" in ceph_zones:
-        return {"error": ceph_zones["error"]}
+    if topology.error:
+        return {"error": topology.error}
     
-    if isinstance(k8s_zones, str) or isinstance(ceph_zones, str):
-        return zoneExist(k8s_zones, ceph_zones)
+    if not (topology.k8s_configured and topology.ceph_configured):
+        return zoneExist(topology)
     
-    all_zone_names = set(k8s_zones.keys()) | set(ceph_zones.keys())
     zones_list = []
 
-    for zone_name in all_zone_names:
-        masters = get_node_name(k8s_zones.get(zone_name, {}).get("masters", []))
-        workers = get_node_name(k8s_zones.get(zone_name, {}).get("workers", []))
-        storage = get_node_name(ceph_zones.get(zone_name, []))
+    for zone in topology.zones.values():
+        masters = [name for name, _ in zone.masters]
+        workers = [name for name, _ in zone.workers]
+        storage = [name for name, _, _ in zone.storage]
 
-        zone_data = {"Zone Name": zone_name}
+        zone_data = {"Zone Name": zone.name}
         
         if masters or workers:
             zone_data["Kubernetes Topology Zone"] = {}
@@ -74,8 +67,20 @@ def map_zones(k8s_zones, ceph_zones):
 
     return {"Zones": zones_list}
 
-def get_zones():
+def select_zones(zones, args):
+    """Filter the zone summary on the zone query parameter and cut out the requested page."""
+    if "Zones" not in zones:
+        return zones
+    selected = [zone for zone in zones["Zones"] if matches({"zone": zone["Zone Name"]}, args, ("zone",))]
+    page, token = paginate(selected, lambda zone: (zone["Zone Name"],), args)
+    return with_continue(dict(zones, Zones=page), token)
+
+def get_zones(args):
     """Endpoint to get summary of all zones in the new format."""
-    k8s_zones = get_k8s_nodes_data()
-    ceph_zones = get_ceph_storage_nodes()
-    return jsonify(map_zones(k8s_zones, ceph_zones))
\ No newline at end of file
+    try:
+        zones = select_zones(map_zones(get_zone_topology()), args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify(zones)
+    response.headers.update(ceph_staleness_headers())
+    return response
\ No newline at end of file
@@ -0,0 +1,98 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Asyncio versions of the upstream reads, used by the async server (async_app.py).
+
+Once the informers and the Ceph collector hold data these return it from memory; on a
+cold cache the apiserver is read with kubernetes_asyncio and Ceph through the backend's
+asyncio implementation, so neither blocks the event loop.
+"""
+
+import json
+from kubernetes_asyncio import client as async_client, config as async_config
+from kubernetes_asyncio.client.exceptions import ApiException
+from resources.k8s_zones import get_node_informer, get_k8s_zone_state, build_zone_mapping, raw_node_record
+from resources.ceph_zones import get_ceph_collector, get_ceph_zone_state
+from resources.ceph_backends import get_ceph_backend
+from resources.pagination import LIST_PAGE_SIZE
+from resources.k8s_client import POOL_SIZE
+
+_api_client = None
+
+async def get_async_api_client():
+    """Return the shared kubernetes_asyncio ApiClient, loading the configuration once."""
+    global _api_client
+    if _api_client is None:
+        configuration = async_client.Configuration()
+        try:
+            async_config.load_incluster_config(client_configuration=configuration)
+        except Exception:
+            await async_config.load_kube_config(client_configuration=configuration)
+        configuration.connection_pool_maxsize = POOL_SIZE
+        _api_client = async_client.ApiClient(configuration)
+    return _api_client
+
+async def get_k8s_zone_state_async():
+    """Return (version, zone data) like get_k8s_zone_state() without blocking the event loop."""
+    try:
+        if get_node_informer().synced.is_set():
+            return get_k8s_zone_state()
+
+        v1 = async_client.CoreV1Api(await get_async_api_client())
+        records = []
+        token = None
+        while True:
+            # Page through the raw node lists, keeping only the reduced records
+            if token:
+                response = await v1.list_node(limit=LIST_PAGE_SIZE, _continue=token, _preload_content=False)
+            else:
+                response = await v1.list_node(limit=LIST_PAGE_SIZE, _preload_content=False)
+            async with response:
+                if not 200 <= response.status <= 299:
+                    raise ApiException(status=response.status, reason=response.reason)
+                page = json.loads(await response.read())
+            records.extend(raw_node_record(node) for node in page.get("items") or [])
+            token = page["metadata"].get("continue")
+            if not token:
+                break
+    except Exception as e:
+        return None, {"error": str(e)}
+
+    zone_mapping = build_zone_mapping(records)
+    return None, (zone_mapping if zone_mapping else "No K8s topology zone present")
+
+async def get_ceph_zone_state_async():
+    """Return (digest, zone data) like get_ceph_zone_state() without blocking the event loop."""
+    collector = get_ceph_collector()
+    if collector.snapshot is not None:
+        return get_ceph_zone_state()
+
+    try:
+        snapshot = collector.store(*await get_ceph_backend().fetch_async())
+    except Exception as e:
+        return None, {"error": str(e)}
+
+    zones = snapshot.zones
+    return snapshot.digest, (zones if zones else "No Ceph zones present")
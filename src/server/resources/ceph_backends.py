@@ -0,0 +1,303 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import os
+import json
+import asyncio
+import logging
+import threading
+import subprocess
+import concurrent.futures
+
+logger = logging.getLogger(__name__)
+
+CEPH_BACKEND = os.environ.get("RRS_CEPH_BACKEND", "ssh")
+CEPH_CONF = os.environ.get("RRS_CEPH_CONF", "/etc/ceph/ceph.conf")
+CEPH_KEYRING = os.environ.get("RRS_CEPH_KEYRING", "/etc/ceph/ceph.client.admin.keyring")
+CEPH_COMMAND_TIMEOUT = int(os.environ.get("RRS_CEPH_COMMAND_TIMEOUT", "30"))
+CEPH_FIXTURE_DIR = os.environ.get("RRS_CEPH_FIXTURE_DIR", "")
+CEPH_MON_HOSTS = [host.strip() for host in os.environ.get("RRS_CEPH_MON_HOSTS", "ncn-m001,ncn-m002,ncn-m003").split(",") if host.strip()]
+CEPH_HEDGE_DELAY = float(os.environ.get("RRS_CEPH_HEDGE_DELAY", "2"))
+SSH_CONTROL_DIR = os.environ.get("RRS_SSH_CONTROL_DIR", "/tmp/rrs-ssh")
+SSH_CONTROL_PERSIST = os.environ.get("RRS_SSH_CONTROL_PERSIST", "10m")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+class CephBackend:
+    """Source of the Ceph `osd tree` and `orch host ls` output, as parsed JSON."""
+
+    def osd_tree(self):
+        raise NotImplementedError
+
+    def host_ls(self):
+        raise NotImplementedError
+
+    def fetch(self):
+        """Return (osd tree, host list)."""
+        return self.osd_tree(), self.host_ls()
+
+    async def fetch_async(self):
+        """Return (osd tree, host list) without blocking the event loop."""
+        return await asyncio.to_thread(self.fetch)
+
+class SshCephBackend(CephBackend):
+    """Run the ceph CLI on the mon hosts over multiplexed ssh connections.
+
+    Each host keeps a persistent ssh control connection (ControlMaster), so both commands
+    and every later refresh reuse one warm session instead of a new handshake. When the
+    preferred host has not answered within the hedge delay the same request is also sent
+    to the next host and the first answer wins; hosts that fail are skipped over.
+    """
+
+    def __init__(self, hosts=None, hedge_delay=CEPH_HEDGE_DELAY, timeout=CEPH_COMMAND_TIMEOUT):
+        self.hosts = list(hosts or CEPH_MON_HOSTS)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.preferred = 0
+        self.attempts = concurrent.futures.ThreadPoolExecutor(max_workers=2 * len(self.hosts), thread_name_prefix="ceph-ssh")
+        self.commands = concurrent.futures.ThreadPoolExecutor(max_workers=2 * len(self.hosts), thread_name_prefix="ceph-ssh-cmd")
+        os.makedirs(SSH_CONTROL_DIR, mode=0o700, exist_ok=True)
+
+    def ssh_command(self, host, command):
+        return [
+            "ssh",
+            "-o", "BatchMode=yes",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={SSH_CONTROL_DIR}/%C",
+            "-o", f"ControlPersist={SSH_CONTROL_PERSIST}",
+            "-o", f"ConnectTimeout={self.timeout}",
+            host,
+            f"ceph {command} -f json"
+        ]
+
+    def run(self, host, command):
+        """Run one ceph command on a host and parse its output."""
+        result = subprocess.run(self.ssh_command(host, command), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise ValueError(f"Error fetching Ceph details from {host}: {result.stderr}")
+        return json.loads(result.stdout)
+
+    def fetch_from(self, host):
+        """Run both commands in parallel over the host's shared control connection."""
+        future_ceph_hosts = self.commands.submit(self.run, host, "orch host ls")
+        ceph_tree = self.run(host, "osd tree")
+        return ceph_tree, future_ceph_hosts.result()
+
+    def hedged(self, func):
+        """Call func(host) on the preferred host, hedging to the next hosts when it is slow or fails."""
+        order = self.hosts[self.preferred:] + self.hosts[:self.preferred]
+        pending = {}
+        errors = []
+
+        def launch():
+            host = order[len(pending) + len(errors)]
+            pending[self.attempts.submit(func, host)] = host
+
+        launch()
+        while pending:
+            can_hedge = len(pending) + len(errors) < len(order)
+            done, _ = concurrent.futures.wait(pending, timeout=self.hedge_delay if can_hedge else None,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            for future in done:
+                host = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning("Ceph command on %s failed: %s", host, e)
+                    errors.append(f"{host}: {e}")
+                    if len(pending) + len(errors) < len(order):
+                        launch()
+                    continue
+                self.preferred = self.hosts.index(host)
+                return result
+        raise ValueError(f"Error fetching Ceph details: {'; '.join(errors)}")
+
+    async def run_async(self, host, command):
+        """Run one ceph command on a host as an asyncio subprocess."""
+        proc = await asyncio.create_subprocess_exec(*self.ssh_command(host, command),
+                                                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), self.timeout)
+        except BaseException:
+            # Timed out, or cancelled because another host answered first
+            if proc.returncode is None:
+                proc.kill()
+                await proc.communicate()
+            raise
+        if proc.returncode != 0:
+            raise ValueError(f"Error fetching Ceph details from {host}: {stderr.decode()}")
+        return json.loads(stdout)
+
+    async def fetch_from_async(self, host):
+        """Run both commands concurrently over the host's shared control connection."""
+        ceph_tree, ceph_hosts = await asyncio.gather(self.run_async(host, "osd tree"),
+                                                     self.run_async(host, "orch host ls"))
+        return ceph_tree, ceph_hosts
+
+    async def fetch_async(self):
+        """Asyncio version of the hedged fetch; the losing requests are cancelled."""
+        order = self.hosts[self.preferred:] + self.hosts[:self.preferred]
+        pending = {}
+        errors = []
+
+        def launch():
+            host = order[len(pending) + len(errors)]
+            pending[asyncio.ensure_future(self.fetch_from_async(host))] = host
+
+        launch()
+        try:
+            while pending:
+                can_hedge = len(pending) + len(errors) < len(order)
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+                for task in done:
+                    host = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning("Ceph command on %s failed: %s", host, e)
+                        errors.append(f"{host}: {e}")
+                        if len(pending) + len(errors) < len(order):
+                            launch()
+                        continue
+                    self.preferred = self.hosts.index(host)
+                    return result
+        finally:
+            for task in pending:
+                task.cancel()
+        raise ValueError(f"Error fetching Ceph details: {'; '.join(errors)}")
+
+    def osd_tree(self):
+        return self.hedged(lambda host: self.run(host, "osd tree"))
+
+    def host_ls(self):
+        return self.hedged(lambda host: self.run(host, "orch host ls"))
+
+    def fetch(self):
+        return self.hedged(self.fetch_from)
+
+class RadosCephBackend(CephBackend):
+    """Issue the commands through one long-lived librados connection.
+
+    The connection is opened on first use and kept for the life of the process; when a
+    command fails with a librados error the handle is shut down and reconnected once.
+    """
+
+    def __init__(self, conffile=CEPH_CONF, keyring=CEPH_KEYRING, timeout=CEPH_COMMAND_TIMEOUT):
+        import rados
+        self.rados = rados
+        self.conffile = conffile
+        self.keyring = keyring
+        self.timeout = timeout
+        self.cluster = None
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        cluster = self.rados.Rados(conffile=self.conffile, conf={"keyring": self.keyring})
+        cluster.connect(timeout=self.timeout)
+        self.cluster = cluster
+        return cluster
+
+    def _shutdown(self):
+        if self.cluster is not None:
+            try:
+                self.cluster.shutdown()
+            except Exception:
+                pass
+            self.cluster = None
+
+    def command(self, prefix, mgr=False):
+        """Run a mon (or mgr) command and return its parsed JSON output."""
+        cmd = json.dumps({"prefix": prefix, "format": "json"})
+        with self.lock:
+            for attempt in range(2):
+                cluster = self.cluster or self._connect()
+                try:
+                    if mgr:
+                        ret, out, errs = cluster.mgr_command(cmd, b'', timeout=self.timeout)
+                    else:
+                        ret, out, errs = cluster.mon_command(cmd, b'', timeout=self.timeout)
+                except self.rados.Error as e:
+                    logger.warning("librados command %r failed, reconnecting: %s", prefix, e)
+                    self._shutdown()
+                    if attempt:
+                        raise
+                    continue
+                if ret != 0:
+                    raise ValueError(f"Error fetching Ceph details: {errs}")
+                return json.loads(out)
+
+    def osd_tree(self):
+        return self.command("osd tree")
+
+    def host_ls(self):
+        # Orchestrator commands are served by the mgr, not the mons
+        return self.command("orch host ls", mgr=True)
+
+class FileCephBackend(CephBackend):
+    """Read saved command output (osd-tree.json, host-ls.json) from a directory, for local testing."""
+
+    def __init__(self, directory=CEPH_FIXTURE_DIR):
+        self.directory = directory
+
+    def _load(self, name):
+        with open(os.path.join(self.directory, name)) as f:
+            return json.load(f)
+
+    def osd_tree(self):
+        return self._load("osd-tree.json")
+
+    def host_ls(self):
+        return self._load("host-ls.json")
+
+BACKENDS = {
+    "ssh": SshCephBackend,
+    "rados": RadosCephBackend,
+    "file": FileCephBackend
+}
+
+def get_ceph_backend():
+    """Return the Ceph backend selected with RRS_CEPH_BACKEND."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if CEPH_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown Ceph backend {CEPH_BACKEND!r}, expected one of {', '.join(BACKENDS)}")
+            _backend = BACKENDS[CEPH_BACKEND]()
+        return _backend
+
+def set_ceph_backend(backend):
+    """Replace the Ceph backend, e.g. with a fake implementing CephBackend."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
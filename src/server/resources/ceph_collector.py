@@ -0,0 +1,123 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_SECONDS = 5
+
+class CephSnapshot:
+    """Result of one Ceph collection: the raw command output, the zones built from it,
+    a digest of those zones and the time it was fetched."""
+
+    def __init__(self, ceph_tree, ceph_hosts, zones, fetched_at):
+        self.ceph_tree = ceph_tree
+        self.ceph_hosts = ceph_hosts
+        self.zones = zones
+        self.fetched_at = fetched_at
+        self.digest = hashlib.sha1(json.dumps(zones, sort_keys=True).encode()).hexdigest()
+
+    def age(self):
+        """Seconds since the snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+class CephCollector:
+    """Refresh Ceph data in the background and serve the last good snapshot.
+
+    Readers never wait for a refresh once a snapshot exists: a snapshot older than the
+    refresh interval is still returned, and the collector is woken up to revalidate it
+    unless a refresh is already running. A failed refresh keeps the previous snapshot and
+    records the error; the next attempt waits for a backoff that doubles with every
+    consecutive failure, up to the refresh interval.
+    """
+
+    def __init__(self, fetch, build, interval, first_fetch_timeout):
+        self.fetch = fetch
+        self.build = build
+        self.interval = interval
+        self.first_fetch_timeout = first_fetch_timeout
+        self.snapshot = None
+        self.error = None
+        self.failures = 0
+        self.refreshing = False
+        self.lock = threading.Lock()
+        self._attempted = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background refresh thread once."""
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ceph-collector", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            if not self.refresh():
+                # Requests keep waking a stale collector, do not retry at their rate
+                time.sleep(min(RETRY_BACKOFF_SECONDS * 2 ** (self.failures - 1), self.interval))
+            self._wake.wait(self.interval)
+
+    def store(self, ceph_tree, ceph_hosts):
+        """Build a snapshot from freshly fetched command output and make it the current one."""
+        snapshot = CephSnapshot(ceph_tree, ceph_hosts, self.build(ceph_tree, ceph_hosts), time.time())
+        self.snapshot, self.error = snapshot, None
+        return snapshot
+
+    def refresh(self):
+        """Fetch and build a new snapshot, keeping the previous one on failure, and return
+        whether it succeeded."""
+        self.refreshing = True
+        try:
+            self.store(*self.fetch())
+            self.failures = 0
+            return True
+        except Exception as e:
+            logger.warning("Ceph refresh failed: %s", e)
+            self.error = str(e)
+            self.failures += 1
+            return False
+        finally:
+            self.refreshing = False
+            self._attempted.set()
+
+    def get(self):
+        """Return the latest snapshot, or None if no collection has succeeded yet."""
+        self.start()
+        snapshot = self.snapshot
+        if snapshot is None:
+            self._attempted.wait(self.first_fetch_timeout)
+            return self.snapshot
+        if snapshot.age() > self.interval and not self.refreshing:
+            # Stale: serve it anyway and let the collector revalidate in the background
+            self._wake.set()
+        return snapshot
@@ -22,123 +22,56 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 
-import json
-# import rados
-import subprocess
-import concurrent.futures
-# def get_ceph_details():
-#     """Fetch Ceph OSD tree details using rados."""
-#     try:
-#         cluster = rados.Rados(conffile="/etc/ceph/ceph.conf")
-#         cluster.conf_set('keyring', '/etc/ceph/ceph.client.admin.keyring')
-#         cluster.connect()
-
-#         cmd = json.dumps({"prefix": "osd tree", "format": "json-pretty"})
-#         result = cluster.mon_command(cmd, b'')
-#         cluster.shutdown()
-
-#         if isinstance(result, tuple) and len(result) >= 2:
-#             json_data = result[1].decode()
-#         else:
-#             raise ValueError(f"Unexpected return format: {result}")
-
-#         return json.loads(json_data)
-#     except Exception as e:
-#         return {"error": str(e)}
-
-# def get_ceph_hosts():
-#     """Fetch Ceph storage node statuses using rados."""
-#     try:
-#         cluster = rados.Rados(conffile="/etc/ceph/ceph.conf")
-#         cluster.conf_set('keyring', '/etc/ceph/ceph.client.admin.keyring')
-#         cluster.connect()
-
-#         cmd = json.dumps({"prefix": "orch host ls", "format": "json-pretty"})
-#         result = cluster.mon_command(cmd, b'')
-#         cluster.shutdown()
-
-#         if isinstance(result, tuple) and len(result) >= 2:
-#             json_data = result[1].decode()
-#         else:
-#             raise ValueError(f"Unexpected return format: {result}")
-
-#         return json.loads(json_data)
-#     except Exception as e:
-#         return {"error": str(e)}
-
-host = 'ncn-m001'
-# def get_ceph_details():
-#     """Function to fetch the CEPH OSD details using ssh"""
-#     cmd = f"ssh {host} 'ceph osd tree -f json-pretty'"
-#     try:
-#         result = subprocess.run(cmd,shell=True,check=True,stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True,)
-#         if result.returncode != 0:
-#             raise ValueError(f"Error fetching Ceph details: {result.stderr}")
-#         return json.loads(result.stdout)
-#     except Exception as e:
-#         return {"error": str(e)}
-
-# def get_ceph_hosts():
-#     """Function to fetch the hosts details using ssh"""
-#     cmd = f"ssh {host} 'ceph orch host ls -f json-pretty'"
-#     try:
-#         result = subprocess.run(cmd,shell=True,check=True,stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True,)
-#         if result.returncode != 0:
-#             raise ValueError(f"Error fetching Ceph details: {result.stderr}")
-#         return json.loads(result.stdout)
-#     except Exception as e:
-#         return {"error": str(e)}
+import os
+import time
+import threading
+from email.utils import formatdate
+from resources.ceph_collector import CephCollector
+from resources.ceph_backends import get_ceph_backend
+from resources.shared_snapshot import SNAPSHOT_MISSING, read_shared_snapshot, snapshot_part_path, snapshot_reader_enabled
 
-def fetch_ceph_data():
-    """Fetch Ceph OSD and host details in parallel."""
-    ceph_details_cmd = "ssh ncn-m001 'ceph osd tree -f json-pretty'"
-    ceph_hosts_cmd = "ssh ncn-m001 'ceph orch host ls -f json-pretty'"
-    
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future_ceph_tree = executor.submit(subprocess.run, ceph_details_cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-        future_ceph_hosts = executor.submit(subprocess.run, ceph_hosts_cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-
-        ceph_tree_result = future_ceph_tree.result()
-        ceph_hosts_result = future_ceph_hosts.result()
-
-        if ceph_tree_result.returncode != 0 or ceph_hosts_result.returncode != 0:
-            raise ValueError(f"Error fetching Ceph details: {ceph_tree_result.stderr} / {ceph_hosts_result.stderr}")
-        
-        ceph_tree = json.loads(ceph_tree_result.stdout)
-        ceph_hosts = json.loads(ceph_hosts_result.stdout)
-        
-        return ceph_tree, ceph_hosts
+CEPH_REFRESH_INTERVAL = float(os.environ.get("RRS_CEPH_REFRESH_INTERVAL", "60"))
+CEPH_FETCH_TIMEOUT = float(os.environ.get("RRS_CEPH_FETCH_TIMEOUT", "30"))
 
-def get_ceph_storage_nodes():
-    """Fetch Ceph storage nodes and their OSD statuses."""
-    # ceph_tree = get_ceph_details()
-    # ceph_hosts = get_ceph_hosts()
-    ceph_tree, ceph_hosts = fetch_ceph_data()
+_collector = None
+_collector_lock = threading.Lock()
 
-    if isinstance(ceph_tree, dict) and "error" in ceph_tree:
-        return {"error": ceph_tree["error"]}
-    
-    if isinstance(ceph_hosts, dict) and "error" in ceph_hosts:
-        return {"error": ceph_hosts["error"]}
+def fetch_ceph_data():
+    """Fetch Ceph OSD and host details through the configured backend."""
+    return get_ceph_backend().fetch()
 
+def build_ceph_zones(ceph_tree, ceph_hosts):
+    """Group Ceph storage hosts and their OSD statuses by rack, in O(nodes)."""
     host_status_map = {host["hostname"]: host["status"] for host in ceph_hosts}
+    nodes = ceph_tree.get('nodes', [])
+
+    # Single pass: id -> node index and OSD id -> owning host id
+    nodes_by_id = {}
+    osd_host = {}
+    for node in nodes:
+        nodes_by_id[node['id']] = node
+        if node['type'] == 'host':
+            for child_id in node.get('children', []):
+                osd_host[child_id] = node['id']
+
+    # Host id -> OSDs adjacency, kept in osd tree order
+    host_osds = {}
+    for node in nodes:
+        if node['type'] == 'osd' and node['id'] in osd_host:
+            host_osds.setdefault(osd_host[node['id']], []).append(
+                {"name": node['name'], "status": node.get('status', 'unknown')})
 
     zones = {}
 
-    for item in ceph_tree.get('nodes', []):
+    for item in nodes:
         if item['type'] == 'rack':  # Zone (Rack)
             rack_name = item['name']
             storage_nodes = []
 
             for child_id in item.get('children', []):
-                host_node = next((x for x in ceph_tree['nodes'] if x['id'] == child_id), None)
+                host_node = nodes_by_id.get(child_id)
 
                 if host_node and host_node['type'] == 'host' and host_node['name'].startswith("ncn-s"):
-                    osd_ids = host_node.get('children', [])
-                    
-                    osds = [osd for osd in ceph_tree['nodes'] if osd['id'] in osd_ids and osd['type'] == 'osd']
-                    osd_status_list = [{"name": osd['name'], "status": osd.get('status', 'unknown')} for osd in osds]
-
                     node_status = host_status_map.get(host_node['name'], "No Status")
                     if node_status in ["", "online"]:
                         node_status = "Ready"
@@ -146,9 +79,65 @@ def get_ceph_storage_nodes():
                     storage_nodes.append({
                         "name": host_node['name'],
                         "status": node_status,
-                        "osds": osd_status_list
+                        "osds": host_osds.get(host_node['id'], [])
                     })
 
             zones[rack_name] = storage_nodes
 
-    return zones if zones else "No Ceph zones present"
+    return zones
+
+def get_ceph_collector():
+    """Return the shared background Ceph collector."""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            _collector = CephCollector(fetch_ceph_data, build_ceph_zones, CEPH_REFRESH_INTERVAL, CEPH_FETCH_TIMEOUT)
+    _collector.start()
+    return _collector
+
+def ceph_staleness_headers():
+    """Response headers telling clients when the served Ceph data was collected."""
+    if snapshot_reader_enabled():
+        shared = read_shared_snapshot(snapshot_part_path("live"))
+        fetched_at = shared["ceph_fetched_at"] if shared else None
+    else:
+        snapshot = get_ceph_collector().snapshot
+        fetched_at = snapshot.fetched_at if snapshot else None
+    if fetched_at is None:
+        return {}
+    return {
+        "X-Ceph-Fetched-At": formatdate(fetched_at, usegmt=True),
+        "X-Ceph-Data-Age": str(int(time.time() - fetched_at))
+    }
+
+def get_ceph_zone_state():
+    """Return (digest, zone data) of the Ceph racks; the digest is None when no data is available."""
+    if snapshot_reader_enabled():
+        shared = read_shared_snapshot()
+        if shared is None:
+            return None, {"error": SNAPSHOT_MISSING}
+        return shared["ceph"]["digest"], shared["ceph"]["data"]
+
+    collector = get_ceph_collector()
+    snapshot = collector.get()
+    if snapshot is None:
+        return None, {"error": collector.error or "Ceph data is not available yet"}
+
+    zones = snapshot.zones
+    return snapshot.digest, (zones if zones else "No Ceph zones present")
+
+def get_ceph_zone_version():
+    """Return the digest of the served Ceph snapshot, or None if there is none yet.
+
+    Never waits for the first collection, so a version lookup on a cold cache does not
+    hold up the request that then fetches the data.
+    """
+    if snapshot_reader_enabled():
+        shared = read_shared_snapshot()
+        return shared["ceph"]["digest"] if shared else None
+    snapshot = get_ceph_collector().snapshot
+    return snapshot.digest if snapshot is not None else None
+
+def get_ceph_storage_nodes():
+    """Fetch Ceph storage nodes and their OSD statuses from the background snapshot."""
+    return get_ceph_zone_state()[1]
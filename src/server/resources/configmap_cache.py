@@ -0,0 +1,108 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import json
+import threading
+from kubernetes import client
+from resources.k8s_client import watch_core_v1
+from resources.informer import Informer
+from resources.shared_snapshot import read_shared_snapshot, snapshot_reader_enabled
+
+_configmap_informers = {}
+_configmap_informers_lock = threading.Lock()
+_parsed = {}
+_parsed_lock = threading.Lock()
+
+def configmap_record(cm):
+    """Reduce a ConfigMap object to its resourceVersion and data."""
+    return {
+        "resource_version": cm.metadata.resource_version,
+        "data": cm.data or {}
+    }
+
+def get_configmap_informer(cm_name, cm_namespace):
+    """Return the shared informer watching a single ConfigMap, starting it on first use."""
+    key = (cm_namespace, cm_name)
+    with _configmap_informers_lock:
+        informer = _configmap_informers.get(key)
+        if informer is None:
+            informer = Informer(f"configmap/{cm_namespace}/{cm_name}",
+                                watch_core_v1().list_namespaced_config_map, configmap_record,
+                                namespace=cm_namespace, field_selector=f"metadata.name={cm_name}")
+            _configmap_informers[key] = informer
+    informer.start()
+    return informer
+
+def get_shared_configmap(cm_name, cm_namespace):
+    """Return the ConfigMap entry of the shared snapshot, or None if it is not published."""
+    snapshot = read_shared_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot["configmaps"].get(f"{cm_namespace}/{cm_name}")
+
+def get_configmap_version(cm_name, cm_namespace):
+    """Return the resourceVersion of a cached ConfigMap, or None if it is not cached."""
+    if snapshot_reader_enabled():
+        shared = get_shared_configmap(cm_name, cm_namespace)
+        return shared.get("resource_version") if shared else None
+    informer = get_configmap_informer(cm_name, cm_namespace)
+    if not informer.wait_for_sync():
+        return None
+    record = informer.store.get(cm_name)
+    return record["resource_version"] if record else None
+
+def get_cached_configmap(cm_name, cm_namespace, cm_key):
+    """Return the parsed JSON of a ConfigMap key and its resourceVersion from the watch cache.
+
+    The key is parsed at most once per resourceVersion, and every reader shares the parsed
+    dictionary, so it must be treated as read-only. Returns None if the cache has not synced.
+    """
+    if snapshot_reader_enabled():
+        shared = get_shared_configmap(cm_name, cm_namespace)
+        if shared and shared.get("missing"):
+            raise client.exceptions.ApiException(status=404, reason=f"ConfigMap {cm_namespace}/{cm_name} not found")
+        if shared is None or cm_key not in shared["keys"]:
+            return None
+        return shared["keys"][cm_key], shared["resource_version"]
+
+    informer = get_configmap_informer(cm_name, cm_namespace)
+    if not informer.wait_for_sync():
+        return None
+
+    record = informer.store.get(cm_name)
+    if record is None:
+        raise client.exceptions.ApiException(status=404, reason=f"ConfigMap {cm_namespace}/{cm_name} not found")
+
+    key = (cm_namespace, cm_name, cm_key)
+    with _parsed_lock:
+        cached = _parsed.get(key)
+        if cached is None or cached[0] != record["resource_version"]:
+            if cm_key in record["data"]:
+                data = json.loads(record["data"][cm_key])
+            else:
+                data = {"critical-services": {}}
+            cached = (record["resource_version"], data)
+            _parsed[key] = cached
+    return cached[1], cached[0]
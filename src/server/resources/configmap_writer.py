@@ -0,0 +1,298 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""Coalescing writer for the critical services ConfigMap.
+
+Updates submitted while a write is pending are merged into a single patch per changed
+ConfigMap: the base ConfigMap, or of a sharded registry the shards the new services
+hash to. The patch carries the resourceVersion the merge was computed from, so a
+concurrent writer (another worker process, or the automation writing the ConfigMap
+directly) makes it fail with 409 Conflict instead of being overwritten; that ConfigMap
+is then merged again on a fresh read and retried.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from kubernetes import client
+from resources.k8s_client import core_v1
+from resources.error_print import pretty_print_error
+from resources.service_registry import (MANIFEST_KEY, REGISTRY_SHARDS, load_key, manifest_shards, shard_for,
+                                        shard_names)
+
+logger = logging.getLogger(__name__)
+
+HTTP_NOT_FOUND = 404
+HTTP_CONFLICT = 409
+BATCH_WINDOW_SECONDS = float(os.environ.get("RRS_UPDATE_BATCH_WINDOW", "0.05"))
+MAX_CONFLICT_RETRIES = int(os.environ.get("RRS_UPDATE_MAX_RETRIES", "5"))
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def dumps(registry):
+    """Compact JSON stored in the ConfigMaps."""
+    return json.dumps(registry, separators=(",", ":"))
+
+def merge_services(existing_services, new_services):
+    """Add the new services missing from existing_services, in place, and return
+    (added, skipped) service names."""
+    added_services = []
+    skipped_services = []
+    for service_name, details in new_services.items():
+        if service_name in existing_services:
+            skipped_services.append(service_name)
+        else:
+            existing_services[service_name] = details
+            added_services.append(service_name)
+    return added_services, skipped_services
+
+def update_response(added_services, skipped_services):
+    """Response of an update request from the services it added and skipped."""
+    response = {"Update": "Successful"}
+
+    if added_services:
+        response["Successfully Added Services"] = added_services
+    if skipped_services:
+        response["Already Existing Services"] = skipped_services
+        if len(added_services) == 0:
+            response["Update"] = "Services Already Exist"
+    return response
+
+class UpdateRequest:
+    """One caller's services, waiting for the batch that writes them or for its turn to
+    lead the next batch."""
+
+    __slots__ = ("services", "result", "wake")
+
+    def __init__(self, services):
+        self.services = services
+        self.result = None
+        self.wake = threading.Event()
+
+class ConfigMapWriter:
+    """Merge concurrent critical service updates into one optimistic-concurrency patch.
+
+    The first caller of a batch becomes its leader: it waits BATCH_WINDOW_SECONDS for
+    other callers to join and writes the whole batch. The requests queued meanwhile are
+    written by the oldest of them, which the leader wakes before returning, so no caller
+    waits for more than the batch in progress and its own. Requests are merged in
+    arrival order, so each caller gets the added/skipped result it would have got from
+    a serial update.
+    """
+
+    def __init__(self, cm_name, cm_namespace, cm_key):
+        self.cm_name = cm_name
+        self.cm_namespace = cm_namespace
+        self.cm_key = cm_key
+        self.lock = threading.Lock()
+        self.pending = []
+        self.writing = False
+
+    def submit(self, services):
+        """Add the services to the ConfigMap and return this caller's response."""
+        request = UpdateRequest(services)
+        with self.lock:
+            self.pending.append(request)
+            leader = not self.writing
+            self.writing = True
+
+        if leader:
+            time.sleep(BATCH_WINDOW_SECONDS)
+        else:
+            request.wake.wait()
+        if request.result is None:
+            # Woken without a result: this request leads the next batch
+            self._lead()
+        return request.result
+
+    def _lead(self):
+        """Write the pending requests, then hand the lead to the oldest request queued
+        during the write."""
+        with self.lock:
+            batch, self.pending = self.pending, []
+        self._write_batch(batch)
+        with self.lock:
+            if self.pending:
+                self.pending[0].wake.set()
+            else:
+                self.writing = False
+
+    def _write_batch(self, batch):
+        try:
+            results = self._write(batch)
+        except client.exceptions.ApiException as e:
+            error = {"error": f"Failed to update ConfigMap: {pretty_print_error(str(e))}"}
+            results = [error] * len(batch)
+        except Exception as e:
+            results = [{"error": str(pretty_print_error(str(e)))}] * len(batch)
+
+        for request, result in zip(batch, results):
+            request.result = result
+            request.wake.set()
+
+    def _write(self, batch):
+        v1 = core_v1()
+        shards, legacy_services = self._shards(v1)
+        if not shards:
+            # Unsharded, the base ConfigMap holds the whole registry
+            shards, legacy_services = [self.cm_name], {}
+
+        by_shard = {}
+        for index, request in enumerate(batch):
+            for service_name, details in request.services.items():
+                by_shard.setdefault(shard_for(service_name, shards), []).append((index, service_name, details))
+
+        added = {}
+        for shard, entries in by_shard.items():
+            added.update(self._write_shard(v1, shard, entries, legacy_services))
+
+        return [
+            update_response([name for name in request.services if added[(index, name)]],
+                            [name for name in request.services if not added[(index, name)]])
+            for index, request in enumerate(batch)
+        ]
+
+    def update_services(self, updates):
+        """Merge {name: fields} into the entries of the services, in the shard each one
+        belongs to, and return the names whose entry actually changed.
+
+        Only the given fields are replaced; other fields of an entry, and the entries of
+        other services, are kept as they are. A shard is only patched when one of its
+        entries changed, with the same resourceVersion guard and conflict retries as
+        additions. A sharded ConfigMap is never migrated from here.
+        """
+        v1 = core_v1()
+        shards, legacy_services = self._shards(v1, migrate=False)
+        if not shards:
+            shards, legacy_services = [self.cm_name], {}
+
+        by_shard = {}
+        for service_name, fields in updates.items():
+            by_shard.setdefault(shard_for(service_name, shards), {})[service_name] = fields
+
+        changed = []
+        for shard, shard_updates in by_shard.items():
+            def apply(services, shard_updates=shard_updates):
+                names = []
+                for service_name, fields in shard_updates.items():
+                    entry = services.get(service_name) or legacy_services.get(service_name) or {}
+                    if any(entry.get(field) != value for field, value in fields.items()) \
+                            or service_name not in services:
+                        services[service_name] = {**entry, **fields}
+                        names.append(service_name)
+                return names, bool(names)
+            changed.extend(self._patch_shard(v1, shard, apply, create=shard != self.cm_name))
+        return changed
+
+    def _shards(self, v1, migrate=True):
+        """Return (shard names, services left in the base ConfigMap) of a sharded registry,
+        migrating an unsharded one first when RRS_REGISTRY_SHARDS asks for it."""
+        for attempt in range(MAX_CONFLICT_RETRIES + 1):
+            cm = v1.read_namespaced_config_map(self.cm_name, self.cm_namespace)
+            data = cm.data or {}
+            shards = manifest_shards(load_key(data, MANIFEST_KEY))
+            services = (load_key(data, self.cm_key) or {}).get("critical-services", {})
+            if shards or REGISTRY_SHARDS <= 0 or not migrate:
+                return shards, services
+            try:
+                return self._migrate(v1, cm.metadata.resource_version, services), {}
+            except client.exceptions.ApiException as e:
+                if e.status != HTTP_CONFLICT or attempt == MAX_CONFLICT_RETRIES:
+                    raise
+                logger.info("configmap %s/%s changed during the migration, retrying", self.cm_namespace, self.cm_name)
+
+    def _migrate(self, v1, resource_version, services):
+        """Move the services of the base ConfigMap into RRS_REGISTRY_SHARDS shards, then
+        store the manifest. Rerunning it after a failure is harmless."""
+        shards = shard_names(self.cm_name, REGISTRY_SHARDS)
+        by_shard = {}
+        for index, (service_name, details) in enumerate(services.items()):
+            by_shard.setdefault(shard_for(service_name, shards), []).append((index, service_name, details))
+        for shard in shards:
+            self._write_shard(v1, shard, by_shard.get(shard, []), {}, create=True)
+
+        v1.patch_namespaced_config_map(self.cm_name, self.cm_namespace, {
+            "metadata": {"resourceVersion": resource_version},
+            "data": {MANIFEST_KEY: dumps({"shards": shards}), self.cm_key: dumps({"critical-services": {}})}
+        })
+        logger.info("configmap %s/%s migrated to %d shards", self.cm_namespace, self.cm_name, len(shards))
+        return shards
+
+    def _write_shard(self, v1, shard, entries, legacy_services, create=None):
+        """Add the (request index, name, details) entries missing from a shard with one
+        patch guarded by its resourceVersion, retrying on conflicts, and return
+        {(request index, name): added}. Missing shards are created."""
+        def apply(services):
+            added = {}
+            for index, service_name, details in entries:
+                added[(index, service_name)] = service_name not in services and service_name not in legacy_services
+                if added[(index, service_name)]:
+                    services[service_name] = details
+            return added, any(added.values())
+        return self._patch_shard(v1, shard, apply, shard != self.cm_name if create is None else create)
+
+    def _patch_shard(self, v1, shard, apply, create):
+        """Read a shard's services, let apply(services) change them in place and return
+        (result, changed), and write them back with one patch guarded by the shard's
+        resourceVersion, reapplying on a fresh read after a conflict. A missing shard is
+        created when `create` is set. Returns the result of the write that succeeded."""
+        for attempt in range(MAX_CONFLICT_RETRIES + 1):
+            try:
+                cm = v1.read_namespaced_config_map(shard, self.cm_namespace)
+                resource_version = cm.metadata.resource_version
+                blob = load_key(cm.data, self.cm_key) or {}
+            except client.exceptions.ApiException as e:
+                if e.status != HTTP_NOT_FOUND or not create:
+                    raise
+                resource_version, blob = None, {}
+
+            services = blob.get("critical-services", {})
+            result, changed = apply(services)
+            if resource_version is not None and not changed:
+                return result
+
+            data = {self.cm_key: dumps({**blob, "critical-services": services})}
+            try:
+                if resource_version is None:
+                    v1.create_namespaced_config_map(self.cm_namespace, {"metadata": {"name": shard}, "data": data})
+                else:
+                    v1.patch_namespaced_config_map(shard, self.cm_namespace, {
+                        "metadata": {"resourceVersion": resource_version}, "data": data})
+                return result
+            except client.exceptions.ApiException as e:
+                if e.status != HTTP_CONFLICT or attempt == MAX_CONFLICT_RETRIES:
+                    raise
+                logger.info("configmap %s/%s changed during the update, retrying", self.cm_namespace, shard)
+
+def get_configmap_writer(cm_name, cm_namespace, cm_key):
+    """Return the shared writer of a ConfigMap key."""
+    key = (cm_namespace, cm_name, cm_key)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = ConfigMapWriter(cm_name, cm_namespace, cm_key)
+        return writer
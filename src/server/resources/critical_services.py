@@ -24,17 +24,71 @@
 
 from kubernetes import client
 from flask import json
-from resources.k8s_zones import get_k8s_nodes_data, load_k8s_config
+from resources.k8s_zones import get_k8s_nodes_data
+from resources.k8s_client import core_v1, apps_v1
+from resources.pod_informer import (get_workload_pods, iter_workload_pods, get_namespace_workload_counts,
+                                    get_shared_namespace, raw_pod_record)
+from resources.workload_informer import (WORKLOAD_TYPES, configured_instances_of, get_workload_informer,
+                                         get_namespace_configured)
+from resources.shared_snapshot import snapshot_reader_enabled, workload_key
+from resources.pagination import list_in_chunks, list_raw_in_chunks
+from resources.service_registry import get_registry, read_registry
 # import os
 
-load_k8s_config()
+def read_workload(namespace, resource_type, name):
+    """Read a Deployment, StatefulSet or DaemonSet."""
+    apps = apps_v1()
+    if resource_type == "Deployment":
+        return apps.read_namespaced_deployment(name, namespace)
+    if resource_type == "StatefulSet":
+        return apps.read_namespaced_stateful_set(name, namespace)
+    if resource_type == "DaemonSet":
+        return apps.read_namespaced_daemon_set(name, namespace)
+    raise ValueError(f"Unsupported resource type: {resource_type}")
 
-def get_namespaced_pods(service_info, service_name):
-    """Fuction to fetch the pods in a namespace and number of instances using Kube-config"""
+def label_selector(selector):
+    """Convert a workload's spec.selector to a label_selector string for list calls."""
+    requirements = [f"{key}={value}" for key, value in sorted((selector.match_labels or {}).items())]
+    for expression in selector.match_expressions or []:
+        if expression.operator == "In":
+            requirements.append(f"{expression.key} in ({','.join(expression.values)})")
+        elif expression.operator == "NotIn":
+            requirements.append(f"{expression.key} notin ({','.join(expression.values)})")
+        elif expression.operator == "Exists":
+            requirements.append(expression.key)
+        elif expression.operator == "DoesNotExist":
+            requirements.append(f"!{expression.key}")
+    return ",".join(requirements)
+
+def get_owner_uids(namespace, resource_type, workload, selector):
+    """UIDs of the objects owning a workload's pods: the workload itself, or for a
+    Deployment its ReplicaSets, which carry the same selector."""
+    if resource_type != "Deployment":
+        return {workload.metadata.uid}
+    return {
+        replica_set.metadata.uid
+        for replica_set in list_in_chunks(apps_v1().list_namespaced_replica_set,
+                                          namespace=namespace, label_selector=selector)
+        if any(owner.uid == workload.metadata.uid for owner in replica_set.metadata.owner_references or [])
+    }
+
+def get_namespaced_pods(service_info, service_name, workload=None):
+    """Fuction to fetch the pods in a namespace and number of instances using Kube-config
+
+    Without the pod index, the workload is read (unless it is passed in) and only the pods
+    matching its label selector are listed. They are kept if they are owned by the
+    workload, or by one of its ReplicaSets.
+    """
     namespace = service_info["namespace"]
     resource_type = service_info["type"]
-    v1 = client.CoreV1Api()
 
+    # Served from the shared pod informer index once it has synced
+    indexed = get_workload_pods(namespace, resource_type, service_name)
+    if indexed is not None:
+        result, running_pods, zone_pod_count = indexed
+        return result, running_pods
+
+    v1 = core_v1()
     nodes_data = get_k8s_nodes_data()
     if isinstance(nodes_data, dict) and "error" in nodes_data:
         return {"error": nodes_data["error"]}
@@ -46,35 +100,115 @@ def get_namespaced_pods(service_info, service_name):
         for node in node_types[node_type]
     }
 
-    # Get all pods in the namespace and filter by owner reference
-    pod_list = v1.list_namespaced_pod(namespace)
+    if workload is None:
+        workload = read_workload(namespace, resource_type, service_name)
+    selector = label_selector(workload.spec.selector)
+    owner_uids = get_owner_uids(namespace, resource_type, workload, selector)
+
+    # Get the pods selected by the workload page by page and verify their owner
     running_pods = 0
     result = []
     zone_pod_count = {}
 
-    for pod in pod_list.items:
-        if pod.metadata.owner_references and any(
-            owner.kind == isDeploy(resource_type) and owner.name.startswith(service_name)
-            for owner in pod.metadata.owner_references
-        ):
-            pod_status = pod.status.phase
+    for pod in map(raw_pod_record, list_raw_in_chunks(v1.list_namespaced_pod, namespace=namespace,
+                                                      label_selector=selector)):
+        if any(kind == isDeploy(resource_type) and uid in owner_uids for kind, name, uid in pod.owner_refs):
+            pod_status = pod.phase
             if pod_status == "Running":
                 running_pods += 1
             
-            node_name = pod.spec.node_name
+            node_name = pod.node
             zone = node_zone_map.get(node_name, "unknown")
 
             # Count pods in each zone
             zone_pod_count[zone] = zone_pod_count.get(zone, 0) + 1
 
             result.append({
-                "Name": pod.metadata.name,
+                "Name": pod.name,
                 "Status": pod_status,
                 "Node": node_name,
                 "Zone": zone
             })
     return result, running_pods
 
+def get_namespaced_pod_iter(service_info, service_name):
+    """Return (pods sorted by name, running count, pod count, workload) of a service. The
+    pods are formatted lazily when they come from the shared pod index; otherwise the
+    workload is read to select them and returned so it is not read twice."""
+    indexed = iter_workload_pods(service_info["namespace"], service_info["type"], service_name)
+    if indexed is not None:
+        return indexed + (None,)
+    workload = read_workload(service_info["namespace"], service_info["type"], service_name)
+    pods, running_pods = get_namespaced_pods(service_info, service_name, workload)
+    pods.sort(key=lambda pod: pod["Name"])
+    return pods, running_pods, len(pods), workload
+
+def get_namespace_workload_counts_live(namespace, node_zone_map):
+    """Running and per-zone pod counts of every workload in a namespace, from the shared pod
+    index or, until it has synced, from a single pod list of the namespace."""
+    counts = get_namespace_workload_counts(namespace)
+    if counts is not None:
+        return counts
+
+    counts = {}
+    for pod in list_raw_in_chunks(core_v1().list_namespaced_pod, namespace=namespace):
+        record = raw_pod_record(pod)
+        zone = node_zone_map.get(record.node, "unknown")
+        for owner in record.owners:
+            running, zone_counts = counts.setdefault(owner, (0, {}))
+            if record.phase == "Running":
+                running += 1
+            zone_counts[zone] = zone_counts.get(zone, 0) + 1
+            counts[owner] = (running, zone_counts)
+    return counts
+
+def get_configured_instances(namespace, resource_types):
+    """Configured instances of every workload of the given types in a namespace:
+    {(type, name): instances}. They come from the workload informers, or until those have
+    synced from one list call per type."""
+    if snapshot_reader_enabled():
+        shared = get_shared_namespace(namespace)
+        if shared is not None:
+            return {tuple(key.split("/", 1)): instances for key, instances in shared["configured"].items()}
+    else:
+        configured = get_namespace_configured(namespace, resource_types)
+        if configured is not None:
+            return configured
+
+    apps = apps_v1()
+    configured = {}
+    if "Deployment" in resource_types:
+        for deployment in list_in_chunks(apps.list_namespaced_deployment, namespace=namespace):
+            configured[("Deployment", deployment.metadata.name)] = configured_instances_of("Deployment", deployment)
+    if "StatefulSet" in resource_types:
+        for statefulset in list_in_chunks(apps.list_namespaced_stateful_set, namespace=namespace):
+            configured[("StatefulSet", statefulset.metadata.name)] = configured_instances_of("StatefulSet", statefulset)
+    if "DaemonSet" in resource_types:
+        for daemonset in list_in_chunks(apps.list_namespaced_daemon_set, namespace=namespace):
+            configured[("DaemonSet", daemonset.metadata.name)] = configured_instances_of("DaemonSet", daemonset)
+    return configured
+
+def get_configured_instance(namespace, resource_type, name, workload=None):
+    """Configured instances of a single workload, from the workload object if it was
+    already read, else from the workload informer of its namespace."""
+    if workload is None and snapshot_reader_enabled():
+        shared = get_shared_namespace(namespace)
+        if shared is not None and workload_key(resource_type, name) in shared["configured"]:
+            return shared["configured"][workload_key(resource_type, name)]
+
+    if resource_type not in WORKLOAD_TYPES:
+        return None
+    if workload is None and not snapshot_reader_enabled():
+        informer = get_workload_informer(namespace, resource_type)
+        if informer.wait_for_sync():
+            with informer.lock:
+                record = informer.store.get(name)
+            if record is not None:
+                return record.instances
+    if workload is None:
+        workload = read_workload(namespace, resource_type, name)
+    return configured_instances_of(resource_type, workload)
+
 # def get_namespaced_services(service_info, service_name):
 #     """Fuction to fetch the services in a namespace and number of instances using Kube-config"""
 #     namespace = service_info["namespace"]
@@ -96,14 +230,19 @@ def isDeploy(resource_type):
     return "ReplicaSet" if resource_type == "Deployment" else resource_type
 
 
-def get_configmap(cm_name, cm_namespace, cm_key):
-    """Fetch the current ConfigMap data from the Kubernetes cluster."""
+def get_configmap(cm_name, cm_namespace, cm_key, cached=True):
+    """Fetch the current ConfigMap data from the Kubernetes cluster.
+
+    By default the data is served from the watch cache and shared between readers, so it
+    must not be modified. Pass cached=False to read a private copy from the apiserver.
+    A sharded registry is returned as the union of its shards.
+    """
     try:
-        v1 = client.CoreV1Api()
-        cm = v1.read_namespaced_config_map(cm_name, cm_namespace)
-        if cm_key in cm.data:
-            return json.loads(cm.data[cm_key])  # Convert JSON string to Python dictionary
-        return {"critical-services": {}}
+        if cached:
+            result = get_registry(cm_name, cm_namespace, cm_key)
+            if result is not None:
+                return result[0]
+        return read_registry(cm_name, cm_namespace, cm_key)
     except client.exceptions.ApiException as e:
         return {"error": f"Failed to fetch ConfigMap: {e}"}
 
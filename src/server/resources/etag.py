@@ -0,0 +1,130 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import json
+import hashlib
+import functools
+from flask import request, make_response, current_app
+from resources.response_cache import (get_response_cache, cache_key, negotiate, variant_etag, variant_etags,
+                                      MSGPACK_MIMETYPE)
+
+def compute_etag(version, path=None, args=None):
+    """Build a strong ETag for a request path and query (the current request by default) from a data version."""
+    if path is None:
+        path, args = request.path, request.args
+    key = repr((path, sorted(args.items(multi=True)), version))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def carries_error(body):
+    """Whether a JSON body reports a failure under an "error" key, at the top level or in
+    one of its sections. Such bodies describe a transient read failure, not the data
+    version, so they are neither cached nor given an ETag."""
+    if b'"error"' not in body:
+        return False
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return False
+    if not isinstance(data, dict):
+        return False
+    return "error" in data or any(isinstance(value, dict) and "error" in value for value in data.values())
+
+def not_modified(response_class, etag, if_none_match):
+    """Return a 304 response if If-None-Match holds the ETag of any representation of the
+    current data version, else None. If-None-Match uses the weak comparison, so W/ tags
+    match too."""
+    for candidate in variant_etags(etag):
+        if if_none_match.contains_weak(candidate):
+            response = response_class(status=304)
+            response.set_etag(candidate)
+            return response
+    return None
+
+def cached_response(response_class, cache, entry, etag, accept_mimetypes, accept_encodings):
+    """Build a response from a cached entry in the representation the client asked for."""
+    media, encoding = negotiate(accept_mimetypes, accept_encodings)
+    body, applied = cache.variant(entry, media, encoding)
+    if entry.mimetype != "application/json":
+        media = "json"
+    response = response_class(body, mimetype=MSGPACK_MIMETYPE if media == "msgpack" else entry.mimetype)
+    if applied != "identity":
+        response.headers["Content-Encoding"] = applied
+    response.set_etag(variant_etag(etag, media, applied))
+    response.vary.update(["Accept", "Accept-Encoding"])
+    return response
+
+def conditional_get(version_func, headers_func=None):
+    """Add a strong ETag to a GET view, answer a matching If-None-Match with 304 and serve
+    repeated requests from the response cache.
+
+    version_func is called with the view arguments and must be cheap: it returns the
+    version of the data the response is built from (resourceVersions, snapshot digests),
+    or None when that is not known, in which case the view runs without an ETag or
+    caching. On a match the view is not called at all, so nothing is fetched or
+    serialized. Otherwise the encoded body of the view's 200 response is cached for that
+    version, unless it reports an error, and later requests only copy it, or the
+    MessagePack, gzip or zstd representation negotiated with Accept and Accept-Encoding.
+    headers_func returns headers that change without the data version and are added to
+    every response.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                version = version_func(**kwargs)
+            except Exception:
+                version = None
+            if version is None:
+                return view(*args, **kwargs)
+
+            etag = compute_etag(version)
+            response = not_modified(current_app.response_class, etag, request.if_none_match)
+            if response is not None:
+                return response
+
+            cache = get_response_cache()
+            key = cache_key(request.path, request.args)
+            entry = cache.get(key, version)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    if response.status_code == 200:
+                        response.set_etag(etag)
+                    return response
+                body = response.get_data()
+                if carries_error(body):
+                    return response
+                entry = cache.put(key, version, body, response.mimetype)
+                if entry is None:
+                    response.set_etag(etag)
+                    return response
+
+            response = cached_response(current_app.response_class, cache, entry, etag,
+                                       request.accept_mimetypes, request.accept_encodings)
+            if headers_func is not None:
+                response.headers.update(headers_func())
+            return response
+        return wrapper
+    return decorator
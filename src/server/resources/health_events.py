@@ -0,0 +1,277 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from resources.k8s_zones import get_k8s_zone_state, get_k8s_zone_version, get_node_informer
+from resources.ceph_zones import get_ceph_collector
+from resources.service_registry import get_registry
+from resources.pod_informer import get_pod_index
+from resources.shared_snapshot import read_shared_snapshot, snapshot_part_path, snapshot_reader_enabled
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUFFER_SIZE = int(os.environ.get("RRS_EVENT_BUFFER_SIZE", "1000"))
+EVENT_POLL_INTERVAL = float(os.environ.get("RRS_EVENT_POLL_INTERVAL", "1"))
+
+CM_NAMESPACE = "rack-resiliency"
+CM_KEY = "critical-service-config.json"
+
+EVENT_TYPES = ("node-status", "osd-status", "pod-zone", "service-balanced")
+
+class EventBroker:
+    """Ring buffer of health events with increasing ids that readers can wait on.
+
+    Ids start at the broker's start time in milliseconds, so the ids of a restarted
+    service are larger than the ones clients saw before, and an id older than the
+    buffer can be told apart from one that is simply up to date.
+    """
+
+    def __init__(self, size=EVENT_BUFFER_SIZE):
+        self.events = deque(maxlen=size)
+        self.last_id = int(time.time() * 1000)
+        self.first_id = self.last_id + 1
+        self.condition = threading.Condition()
+
+    def publish(self, event_type, data):
+        """Append an event and wake up the waiting readers."""
+        with self.condition:
+            self.last_id += 1
+            self.events.append({"id": self.last_id, "type": event_type, "time": time.time(), "data": data})
+            self.condition.notify_all()
+
+    def snapshot(self):
+        """Return the buffered events and their id range for the shared snapshot."""
+        with self.condition:
+            return {
+                "first_id": self.events[0]["id"] if self.events else self.first_id,
+                "last_id": self.last_id,
+                "buffer": list(self.events)
+            }
+
+    def wait(self, last_id, timeout):
+        """Wait up to timeout seconds for events newer than last_id; see events_after."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.last_id != last_id, timeout)
+            first_id = self.events[0]["id"] if self.events else self.first_id
+            return events_after(last_id, first_id, self.last_id, list(self.events))
+
+def events_after(last_id, first_id, newest_id, events):
+    """Events newer than last_id; a single resync event if some of them were dropped or
+    last_id does not belong to this event stream."""
+    if last_id is None or last_id == newest_id:
+        return []
+    if last_id < first_id - 1 or last_id > newest_id:
+        return [{"id": newest_id, "type": "resync", "time": time.time(), "data": {}}]
+    return [event for event in events if event["id"] > last_id]
+
+def collect_nodes():
+    """{node: (zone, status)} of the master, worker and storage nodes, or None until the
+    node informer has synced. Only the caches are read, never the apiserver or Ceph."""
+    if not get_node_informer().synced.is_set():
+        return None, None
+    k8s_zones = get_k8s_zone_state()[1]
+    if not isinstance(k8s_zones, dict) or "error" in k8s_zones:
+        return None, None
+    ceph = get_ceph_collector().snapshot
+    ceph_zones = ceph.zones if ceph is not None and isinstance(ceph.zones, dict) else None
+
+    nodes = {
+        node["name"]: (zone, node["status"])
+        for zone, node_types in k8s_zones.items()
+        for node_type in ["masters", "workers"]
+        for node in node_types[node_type]
+    }
+    osds = None
+    if ceph_zones is not None:
+        osds = {}
+        for zone, storage_nodes in ceph_zones.items():
+            for node in storage_nodes:
+                nodes[node["name"]] = (zone, node["status"])
+                for osd in node["osds"]:
+                    osds[osd["name"]] = (zone, node["name"], osd["status"])
+    return nodes, osds
+
+def collect_critical_services():
+    """(services, version) of rrs-mon-static and rrs-mon-dynamic, each None until it is cached."""
+    static = get_registry("rrs-mon-static", CM_NAMESPACE, CM_KEY)
+    dynamic = get_registry("rrs-mon-dynamic", CM_NAMESPACE, CM_KEY)
+    return tuple(
+        (registry[0].get("critical-services", {}), registry[1]) if registry else (None, None)
+        for registry in (static, dynamic))
+
+def pod_index_versions(services):
+    """Versions of the pod indexes of the namespaces of the critical services."""
+    namespaces = sorted({details["namespace"] for details in services.values()})
+    return tuple(get_pod_index(namespace).informer.version() for namespace in namespaces)
+
+def collect_pod_zones(services):
+    """{(namespace, service, pod): zone} of the pods of every critical service, or None
+    until all their pod indexes have synced."""
+    pod_zones = {}
+    for name, details in services.items():
+        index = get_pod_index(details["namespace"])
+        if not index.informer.synced.is_set():
+            return None
+        indexed = index.get_workload_pods(details["type"], name)
+        for pod in indexed[0]:
+            pod_zones[(details["namespace"], name, pod["Name"])] = pod["Zone"]
+    return pod_zones
+
+def diff(old, new):
+    """Yield (key, old value, new value) for every key whose value changed."""
+    for key in old.keys() | new.keys():
+        if old.get(key) != new.get(key):
+            yield key, old.get(key), new.get(key)
+
+class HealthEventDetector:
+    """Poll the cached zone and critical service data and publish what changed.
+
+    A source that cannot be read keeps its previous state, so an outage of Ceph or the
+    apiserver does not show up as every node or pod disappearing. A poll that sees the
+    same node, Ceph, registry and pod versions as the previous one compares nothing.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.nodes = None
+        self.osds = None
+        self.pod_zones = None
+        self.balanced = None
+        self.key = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the background polling thread once."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="health-events", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Health event detection failed: %s", e)
+            time.sleep(EVENT_POLL_INTERVAL)
+
+    def poll(self):
+        """Compare the current data with the previous poll and publish the differences."""
+        (static, static_version), (dynamic, dynamic_version) = collect_critical_services()
+        ceph = get_ceph_collector().snapshot
+        key = (get_k8s_zone_version(), ceph.digest if ceph is not None else None, static_version,
+               dynamic_version, pod_index_versions(static) if static is not None else None)
+        if key == self.key:
+            return
+
+        nodes, osds = collect_nodes()
+        if nodes is not None:
+            if self.nodes is not None:
+                for node, old, new in diff(self.nodes, nodes):
+                    if (old and old[1]) != (new and new[1]):
+                        self.broker.publish("node-status", {
+                            "node": node, "zone": (new or old)[0],
+                            "old_status": old and old[1], "new_status": new and new[1]
+                        })
+            self.nodes = nodes
+        if osds is not None:
+            if self.osds is not None:
+                for osd, old, new in diff(self.osds, osds):
+                    if (old and old[2]) != (new and new[2]):
+                        zone, host = (new or old)[:2]
+                        self.broker.publish("osd-status", {
+                            "osd": osd, "host": host, "zone": zone,
+                            "old_status": old and old[2], "new_status": new and new[2]
+                        })
+            self.osds = osds
+
+        if static is None or dynamic is None:
+            self.key = key
+            return
+        pod_zones = collect_pod_zones(static)
+        if pod_zones is not None:
+            if self.pod_zones is not None:
+                for (namespace, service, pod), old, new in diff(self.pod_zones, pod_zones):
+                    self.broker.publish("pod-zone", {
+                        "service": service, "namespace": namespace, "pod": pod,
+                        "old_zone": old, "new_zone": new
+                    })
+            self.pod_zones = pod_zones
+        balanced = {name: (details.get("namespace"), details.get("balanced")) for name, details in dynamic.items()}
+        if self.balanced is not None:
+            for service, old, new in diff(self.balanced, balanced):
+                if (old and old[1]) != (new and new[1]):
+                    self.broker.publish("service-balanced", {
+                        "service": service, "namespace": (new or old)[0],
+                        "old": old and old[1], "new": new and new[1]
+                    })
+        self.balanced = balanced
+        self.key = key
+
+_broker = None
+_detector = None
+_broker_lock = threading.Lock()
+
+def get_event_broker():
+    """Return the shared event broker, starting its change detector on first use."""
+    global _broker, _detector
+    with _broker_lock:
+        if _broker is None:
+            _broker = EventBroker()
+            _detector = HealthEventDetector(_broker)
+    _detector.start()
+    return _broker
+
+def get_latest_event_id():
+    """Id of the newest event, where a stream without Last-Event-ID starts."""
+    if snapshot_reader_enabled():
+        snapshot = read_shared_snapshot(snapshot_part_path("live"))
+        return snapshot["events"]["last_id"] if snapshot else None
+    return get_event_broker().last_id
+
+def wait_for_events(last_id, timeout):
+    """Return the events newer than last_id, waiting up to timeout seconds for one."""
+    if not snapshot_reader_enabled():
+        return get_event_broker().wait(last_id, timeout)
+
+    # Worker processes follow the events published in the live part of the shared snapshot
+    deadline = time.monotonic() + timeout
+    while True:
+        snapshot = read_shared_snapshot(snapshot_part_path("live"))
+        if snapshot is not None:
+            events = snapshot["events"]
+            if last_id is None:
+                last_id = events["last_id"]
+            result = events_after(last_id, events["first_id"], events["last_id"], events["buffer"])
+            if result:
+                return result
+        if time.monotonic() >= deadline:
+            return []
+        time.sleep(min(EVENT_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
@@ -0,0 +1,197 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+import time
+import logging
+import threading
+from kubernetes import watch
+from kubernetes.client.exceptions import ApiException
+from resources.pagination import list_pages, list_raw_pages
+
+logger = logging.getLogger(__name__)
+
+HTTP_GONE = 410
+WATCH_TIMEOUT_SECONDS = int(os.environ.get("RRS_WATCH_TIMEOUT_SECONDS", "300"))
+SYNC_TIMEOUT_SECONDS = float(os.environ.get("RRS_INFORMER_SYNC_TIMEOUT", "10"))
+RETRY_BACKOFF_SECONDS = 5
+
+class Record:
+    """Base of the compact records kept by informers: slots only, compared field by field."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class Informer:
+    """Keep an in-memory copy of a Kubernetes object list in sync using list + watch.
+
+    Objects are reduced with `transform` before being stored, so only the fields the
+    service actually reads are kept. Handlers registered with `add_handler` are called
+    as handler(event_type, key, old, new) with the informer lock held, and only when
+    the transformed record really changed. `changed_resource_version` is the
+    resourceVersion of the last such change and can be used as a data version. Handlers
+    registered with `add_sync_handler` are called as handler() with the lock held after
+    every full list has been applied.
+
+    When `raw_transform` is given, the lists are read as raw JSON and reduced with it
+    instead, skipping the client's model deserialization; it must build the same
+    record from the object dict that `transform` builds from the watched model.
+    """
+
+    def __init__(self, name, list_func, transform, raw_transform=None, **list_kwargs):
+        self.name = name
+        self.list_func = list_func
+        self.transform = transform
+        self.raw_transform = raw_transform
+        self.list_kwargs = list_kwargs
+        self.lock = threading.RLock()
+        self.store = {}
+        self.resource_version = None
+        self.changed_resource_version = None
+        self.synced = threading.Event()
+        self.attempted = threading.Event()
+        self.handlers = []
+        self.sync_handlers = []
+        self._thread = None
+
+    def add_handler(self, handler):
+        """Register a callback for ADDED/MODIFIED/DELETED changes of the store."""
+        with self.lock:
+            self.handlers.append(handler)
+
+    def add_sync_handler(self, handler):
+        """Register a callback for the end of every full list."""
+        with self.lock:
+            self.sync_handlers.append(handler)
+
+    def version(self):
+        """Return the resourceVersion of the last change, or None if the informer has not synced."""
+        return self.changed_resource_version if self.synced.is_set() else None
+
+    def start(self):
+        """Start the background list + watch thread once."""
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"informer-{self.name}", daemon=True)
+                self._thread.start()
+
+    def wait_for_sync(self, timeout=SYNC_TIMEOUT_SECONDS):
+        """Start the informer if needed and wait until the initial list has been loaded.
+
+        Only the first list attempt is waited for, so callers can fall back to a direct
+        read straight away while the apiserver is unreachable.
+        """
+        self.start()
+        self.attempted.wait(timeout)
+        return self.synced.is_set()
+
+    def _run(self):
+        while True:
+            try:
+                self._list()
+                while True:
+                    self._watch()
+            except ApiException as e:
+                if e.status == HTTP_GONE:
+                    # Our resourceVersion is too old for the apiserver, start over with a fresh list
+                    logger.info("%s: watch expired, resyncing", self.name)
+                    continue
+                logger.warning("%s: list/watch failed: %s", self.name, e)
+            except Exception as e:
+                logger.warning("%s: list/watch failed: %s", self.name, e)
+            self.attempted.set()
+            time.sleep(RETRY_BACKOFF_SECONDS)
+
+    def _list(self):
+        """Replace the store with a full list, emitting the difference as events.
+
+        The list is read in pages and each page is reduced before the next one is
+        requested, so only the transformed records of the whole list are held.
+        """
+        records = {}
+        resource_version = None
+        if self.raw_transform is not None:
+            for page in list_raw_pages(self.list_func, **self.list_kwargs):
+                resource_version = page["metadata"].get("resourceVersion")
+                for obj in page.get("items") or []:
+                    records[obj["metadata"]["name"]] = self.raw_transform(obj)
+        else:
+            for page in list_pages(self.list_func, **self.list_kwargs):
+                resource_version = page.metadata.resource_version
+                for obj in page.items:
+                    records[obj.metadata.name] = self.transform(obj)
+
+        with self.lock:
+            self.resource_version = resource_version
+            for key in list(self.store):
+                if key not in records:
+                    self._apply("DELETED", key, None)
+            for key, record in records.items():
+                self._apply("MODIFIED" if key in self.store else "ADDED", key, record)
+            if self.changed_resource_version is None:
+                self.changed_resource_version = self.resource_version
+            for handler in self.sync_handlers:
+                try:
+                    handler()
+                except Exception as e:
+                    logger.warning("%s: sync handler failed: %s", self.name, e)
+        self.synced.set()
+        self.attempted.set()
+
+    def _watch(self):
+        """Stream changes from the last seen resourceVersion until the watch times out."""
+        w = watch.Watch()
+        for event in w.stream(self.list_func, resource_version=self.resource_version,
+                              timeout_seconds=WATCH_TIMEOUT_SECONDS, **self.list_kwargs):
+            event_type = event["type"]
+            if event_type not in ("ADDED", "MODIFIED", "DELETED"):
+                continue
+            obj = event["object"]
+            with self.lock:
+                self.resource_version = obj.metadata.resource_version
+                self._apply(event_type, obj.metadata.name, None if event_type == "DELETED" else self.transform(obj))
+
+    def _apply(self, event_type, key, record):
+        old = self.store.get(key)
+        if event_type == "DELETED":
+            if key not in self.store:
+                return
+            del self.store[key]
+        else:
+            if old == record:
+                return
+            self.store[key] = record
+        self.changed_resource_version = self.resource_version
+        for handler in self.handlers:
+            try:
+                handler(event_type, key, old, record)
+            except Exception as e:
+                logger.warning("%s: event handler failed: %s", self.name, e)
@@ -0,0 +1,92 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""Shared Kubernetes API client.
+
+The configuration is loaded once per process into a single ApiClient, whose urllib3
+pool keeps up to RRS_K8S_POOL_SIZE connections to the apiserver alive, so requests
+reuse established TLS connections instead of each API object getting its own.
+
+The informers use a second ApiClient with a pool of RRS_K8S_WATCH_POOL_SIZE: each of
+their watches holds a connection for minutes, so sharing the request pool would let a
+few namespaces' watches take every connection and leave the request path blocked or on
+throwaway connections.
+
+In-cluster, the loader installs a refresh hook on that configuration that re-reads the
+projected service account token when it is older than a minute, so token rotation is
+picked up without reloading anything.
+"""
+
+import os
+import threading
+from kubernetes import client, config
+
+POOL_SIZE = int(os.environ.get("RRS_K8S_POOL_SIZE", "16"))
+WATCH_POOL_SIZE = int(os.environ.get("RRS_K8S_WATCH_POOL_SIZE", "64"))
+
+_api_client = None
+_watch_api_client = None
+_api_client_lock = threading.Lock()
+
+def load_k8s_configuration(pool_size=POOL_SIZE):
+    """Load the in-cluster configuration, or the kube-config outside of a cluster."""
+    configuration = client.Configuration()
+    try:
+        config.load_incluster_config(client_configuration=configuration)
+    except Exception:
+        config.load_kube_config(client_configuration=configuration)
+    configuration.connection_pool_maxsize = pool_size
+    return configuration
+
+def get_api_client():
+    """Return the process-wide ApiClient, loading the configuration on first use."""
+    global _api_client
+    with _api_client_lock:
+        if _api_client is None:
+            _api_client = client.ApiClient(load_k8s_configuration())
+        return _api_client
+
+def get_watch_api_client():
+    """Return the process-wide ApiClient of the informers' lists and watches."""
+    global _watch_api_client
+    with _api_client_lock:
+        if _watch_api_client is None:
+            _watch_api_client = client.ApiClient(load_k8s_configuration(WATCH_POOL_SIZE))
+        return _watch_api_client
+
+def core_v1():
+    """CoreV1Api bound to the shared ApiClient."""
+    return client.CoreV1Api(get_api_client())
+
+def apps_v1():
+    """AppsV1Api bound to the shared ApiClient."""
+    return client.AppsV1Api(get_api_client())
+
+def watch_core_v1():
+    """CoreV1Api bound to the informers' ApiClient."""
+    return client.CoreV1Api(get_watch_api_client())
+
+def watch_apps_v1():
+    """AppsV1Api bound to the informers' ApiClient."""
+    return client.AppsV1Api(get_watch_api_client())
@@ -22,50 +22,174 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 
-from kubernetes import client, config
+import threading
+from resources.k8s_client import core_v1, watch_core_v1
+from resources.informer import Informer, Record
+from resources.pagination import list_raw_in_chunks
+from resources.shared_snapshot import SNAPSHOT_MISSING, read_shared_snapshot, snapshot_reader_enabled
 
-def load_k8s_config():
-    """Load Kubernetes configuration for API access."""
-    try:
-        config.load_incluster_config()
-    except Exception:
-        config.load_kube_config()
+ZONE_LABEL = 'topology.kubernetes.io/zone'
+
+_node_informer = None
+_node_informer_lock = threading.Lock()
+_zone_mapping = {}
+_node_zones = {}
 
 def get_k8s_nodes():
-    """Retrieve all Kubernetes nodes."""
+    """Retrieve all Kubernetes nodes as node records, listing them one page at a time."""
     try:
-        load_k8s_config()
-        v1 = client.CoreV1Api()
-        return v1.list_node().items
+        v1 = core_v1()
+        return [raw_node_record(node) for node in list_raw_in_chunks(v1.list_node)]
     except Exception as e:
         return {"error": str(e)}
 
-def get_k8s_nodes_data():
-    """Fetch Kubernetes nodes and organize them by topology zone."""
-    nodes = get_k8s_nodes()
+class NodeRecord(Record):
+    """The fields of a node used for the zone mapping."""
 
-    if isinstance(nodes, dict) and "error" in nodes:
-        return {"error": nodes["error"]}
+    __slots__ = ("name", "status", "zone")
+
+    def __init__(self, name, status, zone):
+        self.name = name
+        self.status = status
+        self.zone = zone
+
+def node_record(node):
+    """Reduce a node object to the fields used for the zone mapping."""
+    node_status = node.status.conditions[-1].status if node.status.conditions else 'Unknown'
+    return NodeRecord(node.metadata.name, "Ready" if node_status == "True" else "NotReady",
+                      (node.metadata.labels or {}).get(ZONE_LABEL, None))
 
+def raw_node_record(node):
+    """Reduce a node dict of a raw list response to a node record."""
+    conditions = (node.get("status") or {}).get("conditions")
+    node_status = conditions[-1].get("status") if conditions else 'Unknown'
+    metadata = node["metadata"]
+    return NodeRecord(metadata["name"], "Ready" if node_status == "True" else "NotReady",
+                      (metadata.get("labels") or {}).get(ZONE_LABEL, None))
+
+def node_type(node_name):
+    """Section of a zone a node is listed in, or None for other nodes."""
+    if node_name.startswith("ncn-m"):
+        return "masters"
+    if node_name.startswith("ncn-w"):
+        return "workers"
+    return None
+
+def build_zone_mapping(records):
+    """Organize node records by topology zone into masters and workers."""
     zone_mapping = {}
 
-    for node in nodes:
-        node_name = node.metadata.name
-        node_status = node.status.conditions[-1].status if node.status.conditions else 'Unknown'
-        node_zone = node.metadata.labels.get('topology.kubernetes.io/zone', None)
-        
-        if node_status == "True":
-            node_status = "Ready"
-        else:
-            node_status = "NotReady"
+    for record in records:
+        node_name = record.name
+        node_zone = record.zone
 
         if node_zone:
             if node_zone not in zone_mapping:
                 zone_mapping[node_zone] = {'masters': [], 'workers': []}
 
-            if node_name.startswith("ncn-m"):
-                zone_mapping[node_zone]['masters'].append({"name": node_name, "status": node_status})
-            elif node_name.startswith("ncn-w"):
-                zone_mapping[node_zone]['workers'].append({"name": node_name, "status": node_status})
+            section = node_type(node_name)
+            if section:
+                zone_mapping[node_zone][section].append({"name": node_name, "status": record.status})
+
+    return zone_mapping
+
+def _rebuild_zone_mapping():
+    """Build the zone mapping from every node record, once a full list is loaded."""
+    global _zone_mapping
+    _zone_mapping = build_zone_mapping(_node_informer.store.values())
+
+def _on_node_event(event_type, name, old, new):
+    """Keep the node zones and the zone mapping up to date with a changed node record.
+
+    The zone of the node is updated right away. Until the first list is loaded the
+    mapping is left to _rebuild_zone_mapping; afterwards only the entry of the node's
+    zone is replaced, except when the node moved to another zone.
+    """
+    global _zone_mapping
+    section = node_type(name)
+    if new is not None and new.zone and section:
+        _node_zones[name] = new.zone
+    else:
+        _node_zones.pop(name, None)
+
+    if not _node_informer.synced.is_set():
+        return
+    old_zone, new_zone = old and old.zone, new and new.zone
+    if old is not None and new is not None and old_zone != new_zone:
+        _rebuild_zone_mapping()
+        return
+    zone = new_zone or old_zone
+    if not zone:
+        return
 
-    return zone_mapping if zone_mapping else "No K8s topology zone present"
+    # Replace the zone's entry in a copy, readers may still hold the current mapping
+    zone_mapping = dict(_zone_mapping)
+    entry = dict(zone_mapping.get(zone) or {'masters': [], 'workers': []})
+    if section:
+        nodes = entry[section]
+        if new is None:
+            entry[section] = [node for node in nodes if node["name"] != name]
+        elif old is None:
+            entry[section] = nodes + [{"name": name, "status": new.status}]
+        else:
+            entry[section] = [{"name": name, "status": new.status} if node["name"] == name else node
+                              for node in nodes]
+    zone_mapping[zone] = entry
+    if new is None and not any(record.zone == zone for record in _node_informer.store.values()):
+        del zone_mapping[zone]
+    _zone_mapping = zone_mapping
+
+def get_node_zone(node_name):
+    """Return the topology zone of a master/worker node known to the node informer."""
+    return _node_zones.get(node_name, "unknown")
+
+def get_node_informer():
+    """Return the shared node informer, starting it on first use."""
+    global _node_informer
+    with _node_informer_lock:
+        if _node_informer is None:
+            _node_informer = Informer("nodes", watch_core_v1().list_node, node_record, raw_node_record)
+            _node_informer.add_handler(_on_node_event)
+            _node_informer.add_sync_handler(_rebuild_zone_mapping)
+        _node_informer.start()
+        return _node_informer
+
+def get_k8s_zone_state():
+    """Return (version, zone data) for the Kubernetes topology zones.
+
+    The version is the resourceVersion of the last node change seen by the informer. It is
+    None when the informer has not synced and the nodes were read directly.
+    """
+    if snapshot_reader_enabled():
+        snapshot = read_shared_snapshot()
+        if snapshot is None:
+            return None, {"error": SNAPSHOT_MISSING}
+        return snapshot["k8s"]["version"], snapshot["k8s"]["data"]
+
+    try:
+        informer = get_node_informer()
+        if informer.wait_for_sync():
+            with informer.lock:
+                return informer.changed_resource_version, (_zone_mapping if _zone_mapping else "No K8s topology zone present")
+    except Exception:
+        pass
+
+    # The informer has not completed its first list yet, read the nodes directly
+    nodes = get_k8s_nodes()
+
+    if isinstance(nodes, dict) and "error" in nodes:
+        return None, {"error": nodes["error"]}
+
+    zone_mapping = build_zone_mapping(nodes)
+    return None, (zone_mapping if zone_mapping else "No K8s topology zone present")
+
+def get_k8s_zone_version():
+    """Return the version of the zone mapping without reading it, or None if it is not cached."""
+    if snapshot_reader_enabled():
+        snapshot = read_shared_snapshot()
+        return snapshot["k8s"]["version"] if snapshot else None
+    return get_node_informer().version()
+
+def get_k8s_nodes_data():
+    """Fetch Kubernetes nodes and organize them by topology zone."""
+    return get_k8s_zone_state()[1]
@@ -0,0 +1,183 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import os
+import json
+import base64
+import binascii
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LIST_PAGE_SIZE = int(os.environ.get("RRS_LIST_PAGE_SIZE", "500"))
+
+class PaginationError(ValueError):
+    """Invalid limit, continue token, filter or field selection in a request."""
+
+def list_pages(list_func, limit=LIST_PAGE_SIZE, **kwargs):
+    """Yield the pages of a Kubernetes list call, following the continue token.
+
+    Only one page of objects is referenced at a time, so the peak memory of a list is
+    bounded by the page size. All pages come from the same consistent snapshot; an
+    expired continue token raises the 410 ApiException of the apiserver.
+    """
+    token = None
+    while True:
+        if token:
+            page = list_func(limit=limit, _continue=token, **kwargs)
+        else:
+            page = list_func(limit=limit, **kwargs)
+        token = page.metadata._continue
+        yield page
+        if not token:
+            return
+
+def list_in_chunks(list_func, limit=LIST_PAGE_SIZE, **kwargs):
+    """Yield the items of a Kubernetes list call, reading them page by page."""
+    for page in list_pages(list_func, limit=limit, **kwargs):
+        yield from page.items
+
+def list_raw_pages(list_func, limit=LIST_PAGE_SIZE, **kwargs):
+    """Like list_pages, but yield every page as the parsed JSON of the response.
+
+    The list is requested with _preload_content=False, so the client does not build its
+    model objects for the items; callers read the few fields they need from the dicts.
+    """
+    token = None
+    while True:
+        if token:
+            response = list_func(limit=limit, _continue=token, _preload_content=False, **kwargs)
+        else:
+            response = list_func(limit=limit, _preload_content=False, **kwargs)
+        try:
+            data = response.data
+        finally:
+            response.release_conn()
+        page = orjson.loads(data) if orjson is not None else json.loads(data)
+        token = (page.get("metadata") or {}).get("continue")
+        yield page
+        if not token:
+            return
+
+def list_raw_in_chunks(list_func, limit=LIST_PAGE_SIZE, **kwargs):
+    """Yield the items of a Kubernetes list call as dicts, reading them page by page."""
+    for page in list_raw_pages(list_func, limit=limit, **kwargs):
+        yield from page.get("items") or []
+
+def encode_continue(key):
+    """Opaque continue token resuming a listing after the item with the given sort key."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+def decode_continue(token):
+    """Return the sort key a continue token resumes after."""
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(token.encode())))
+    except (binascii.Error, ValueError, TypeError):
+        raise PaginationError(f"Invalid continue token: {token}")
+
+def parse_limit(args):
+    """Return the limit query parameter, or None when the listing is not paginated."""
+    limit = args.get("limit")
+    if limit is None:
+        return None
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise PaginationError("limit must be a positive integer")
+    return limit
+
+class PageIterator:
+    """Lazily iterate the page selected by the limit/continue query parameters out of
+    items sorted by key.
+
+    The query parameters are validated on creation. Once the iteration is done, `token`
+    holds the continue token of the next page, or None if this was the last one. The
+    token holds the key of the last item, so items added or removed between two
+    requests do not shift the following pages.
+    """
+
+    def __init__(self, items, key, args):
+        self.items = items
+        self.key = key
+        self.limit = parse_limit(args)
+        token = args.get("continue")
+        self.after = decode_continue(token) if token else None
+        self.token = None
+
+    def __iter__(self):
+        count = 0
+        last = None
+        for item in self.items:
+            if self.after is not None and tuple(self.key(item)) <= self.after:
+                continue
+            if self.limit is not None and count == self.limit:
+                self.token = encode_continue(self.key(last))
+                return
+            yield item
+            last = item
+            count += 1
+
+def paginate(items, key, args):
+    """Cut the page selected by the limit/continue query parameters out of items sorted by key.
+
+    Returns (page, continue token or None).
+    """
+    page = PageIterator(items, key, args)
+    return list(page), page.token
+
+def matches(record, args, fields):
+    """Whether a record passes the filters of the query; a filter may list values separated by commas."""
+    for field in fields:
+        wanted = args.get(field)
+        if wanted and str(record.get(field)) not in wanted.split(","):
+            return False
+    return True
+
+def with_continue(result, token):
+    """Add the continue token of the next page to a list response, if there is one."""
+    if token:
+        result["continue"] = token
+    return result
+
+def normalize_field(name):
+    """Compare field names case-insensitively, with "_" and "-" standing for spaces."""
+    return name.strip().lower().replace("_", " ").replace("-", " ")
+
+def parse_fields(args, available):
+    """Return the keys of available selected by the fields query parameter, or all of them
+    when it is absent. "fields=zone_name,management_masters" selects "Zone Name" and
+    "Management Masters"."""
+    if not args.get("fields"):
+        return set(available)
+    by_name = {normalize_field(key): key for key in available}
+    requested = [field for field in args["fields"].split(",") if field.strip()]
+    unknown = [field for field in requested if normalize_field(field) not in by_name]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return {by_name[normalize_field(field)] for field in requested}
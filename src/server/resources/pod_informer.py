@@ -0,0 +1,291 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import threading
+from resources.k8s_client import watch_core_v1
+from resources.informer import Informer, Record
+from resources.k8s_zones import get_node_informer, get_node_zone
+from resources.shared_snapshot import read_shared_snapshot, snapshot_part_path, snapshot_reader_enabled, workload_key
+
+_pod_indexes = {}
+_pod_indexes_lock = threading.Lock()
+
+def workload_refs(owner_refs, template_hash):
+    """Return the (kind, name) of the workloads owning a pod from its (kind, name, uid)
+    owner references.
+
+    Pods of a Deployment are owned by a ReplicaSet named "<deployment>-<pod-template-hash>",
+    so those are indexed under the Deployment itself.
+    """
+    refs = []
+    for kind, name, uid in owner_refs:
+        if kind == "ReplicaSet" and template_hash and name.endswith(f"-{template_hash}"):
+            refs.append(("Deployment", name[:-len(template_hash) - 1]))
+        else:
+            refs.append((kind, name))
+    return tuple(refs)
+
+class PodRecord(Record):
+    """The fields of a pod used for critical service lookups. `owner_refs` holds the
+    (kind, name, uid) of the pod's owners and `owners` the workloads derived from them."""
+
+    __slots__ = ("name", "phase", "node", "owner_refs", "owners")
+
+    def __init__(self, name, phase, node, owner_refs, template_hash):
+        self.name = name
+        self.phase = phase
+        self.node = node
+        self.owner_refs = owner_refs
+        self.owners = workload_refs(owner_refs, template_hash)
+
+def pod_record(pod):
+    """Reduce a pod object to the fields used for critical service lookups."""
+    return PodRecord(
+        pod.metadata.name, pod.status.phase, pod.spec.node_name,
+        tuple((owner.kind, owner.name, owner.uid) for owner in pod.metadata.owner_references or []),
+        (pod.metadata.labels or {}).get("pod-template-hash"))
+
+def raw_pod_record(pod):
+    """Reduce a pod dict of a raw list response to a pod record."""
+    metadata = pod["metadata"]
+    return PodRecord(
+        metadata["name"], (pod.get("status") or {}).get("phase"), (pod.get("spec") or {}).get("nodeName"),
+        tuple((owner.get("kind"), owner.get("name"), owner.get("uid")) for owner in metadata.get("ownerReferences") or []),
+        (metadata.get("labels") or {}).get("pod-template-hash"))
+
+class PodIndex:
+    """Pods of one namespace indexed by owning workload, with running and per-zone counts.
+
+    The counts are updated from the pod informer events, and re-bucketed when a node
+    moves to another zone, so reading them never walks the pod list. `running_zone_counts`
+    is the workload x zone matrix of running replicas the zone balance is derived from.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.informer = Informer(f"pods/{namespace}", watch_core_v1().list_namespaced_pod,
+                                 pod_record, raw_pod_record, namespace=namespace)
+        self.lock = self.informer.lock
+        self.pods = {}
+        self.running = {}
+        self.zone_counts = {}
+        self.running_zone_counts = {}
+        self.node_counts = {}
+        self.node_running_counts = {}
+        self.node_zones = {}
+        self.informer.add_handler(self._on_pod_event)
+
+    def _on_pod_event(self, event_type, name, old, new):
+        if old:
+            self._count(old, -1)
+        if new:
+            self._count(new, 1)
+
+    def _count(self, record, delta):
+        node = record.node
+        if node not in self.node_zones:
+            self.node_zones[node] = get_node_zone(node)
+        zone = self.node_zones[node]
+        node_counts = self.node_counts.setdefault(node, {})
+        node_running_counts = self.node_running_counts.setdefault(node, {})
+
+        for owner in record.owners:
+            pods = self.pods.setdefault(owner, {})
+            if delta > 0:
+                pods[record.name] = record
+            else:
+                pods.pop(record.name, None)
+            if not pods:
+                del self.pods[owner]
+
+            if record.phase == "Running":
+                _add(self.running, owner, delta)
+                _add(self.running_zone_counts.setdefault(owner, {}), zone, delta)
+                if not self.running_zone_counts[owner]:
+                    del self.running_zone_counts[owner]
+                _add(node_running_counts, owner, delta)
+            _add(self.zone_counts.setdefault(owner, {}), zone, delta)
+            if not self.zone_counts[owner]:
+                del self.zone_counts[owner]
+            _add(node_counts, owner, delta)
+
+        if not node_running_counts:
+            del self.node_running_counts[node]
+        if not node_counts:
+            del self.node_counts[node]
+            del self.node_zones[node]
+
+    def on_node_event(self, event_type, name, old, new):
+        """Move the counts of pods on a node when the node's zone changed."""
+        with self.lock:
+            if name not in self.node_zones:
+                return
+            old_zone, new_zone = self.node_zones[name], get_node_zone(name)
+            if old_zone == new_zone:
+                return
+            self.node_zones[name] = new_zone
+            for owner, count in self.node_counts[name].items():
+                zone_counts = self.zone_counts[owner]
+                _add(zone_counts, old_zone, -count)
+                _add(zone_counts, new_zone, count)
+            for owner, count in self.node_running_counts.get(name, {}).items():
+                zone_counts = self.running_zone_counts[owner]
+                _add(zone_counts, old_zone, -count)
+                _add(zone_counts, new_zone, count)
+
+    def get_workload_pods(self, kind, name):
+        """Return the pods, running count and per-zone counts of a workload."""
+        owner = (kind, name)
+        with self.lock:
+            pods = [
+                {
+                    "Name": record.name,
+                    "Status": record.phase,
+                    "Node": record.node,
+                    "Zone": get_node_zone(record.node)
+                }
+                for record in self.pods.get(owner, {}).values()
+            ]
+            return pods, self.running.get(owner, 0), dict(self.zone_counts.get(owner, {}))
+
+    def iter_workload_pods(self, kind, name):
+        """Return (pods, running count, pod count) of a workload, with the pods sorted by
+        name and only formatted while they are iterated."""
+        owner = (kind, name)
+        with self.lock:
+            # Records are replaced, never modified, so they can be read after the lock is released
+            records = sorted(self.pods.get(owner, {}).values(), key=lambda record: record.name)
+            running = self.running.get(owner, 0)
+        pods = (
+            {
+                "Name": record.name,
+                "Status": record.phase,
+                "Node": record.node,
+                "Zone": get_node_zone(record.node)
+            }
+            for record in records
+        )
+        return pods, running, len(records)
+
+    def get_running_zone_counts(self, kind, name):
+        """Return the running replicas of a workload per zone."""
+        with self.lock:
+            return dict(self.running_zone_counts.get((kind, name), {}))
+
+    def get_workload_counts(self):
+        """Return {(kind, name): (running, per-zone counts)} for every workload in the namespace."""
+        with self.lock:
+            return {
+                owner: (self.running.get(owner, 0), dict(self.zone_counts.get(owner, {})))
+                for owner in self.pods
+            }
+
+def _add(counts, key, delta):
+    """Add delta to a counter dict, dropping keys that reach zero."""
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+def get_pod_index(namespace):
+    """Return the shared pod index of a namespace, starting its informer on first use."""
+    with _pod_indexes_lock:
+        index = _pod_indexes.get(namespace)
+        if index is None:
+            index = PodIndex(namespace)
+            get_node_informer().add_handler(index.on_node_event)
+            _pod_indexes[namespace] = index
+    index.informer.start()
+    return index
+
+def get_shared_namespace(namespace):
+    """Return a namespace's entry of the shared snapshot, or None if it is not published."""
+    snapshot = read_shared_snapshot()
+    return snapshot["namespaces"].get(namespace) if snapshot else None
+
+def get_workload_pods(namespace, kind, name):
+    """Look up a workload's pods in the shared index, or return None if it is not synced yet."""
+    if snapshot_reader_enabled():
+        # The pods are published in a file of their own, only decoded by the requests that list them
+        shared = read_shared_snapshot(snapshot_part_path(f"pods-{namespace}"))
+        entry = shared["workloads"].get(workload_key(kind, name)) if shared else None
+        return tuple(entry) if entry else None
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    return index.get_workload_pods(kind, name)
+
+def iter_workload_pods(namespace, kind, name):
+    """Like get_workload_pods, but return (pods sorted by name and formatted lazily, running
+    count, pod count), or None if the index is not synced yet."""
+    if snapshot_reader_enabled():
+        indexed = get_workload_pods(namespace, kind, name)
+        if indexed is None:
+            return None
+        pods, running, zone_counts = indexed
+        return sorted(pods, key=lambda pod: pod["Name"]), running, len(pods)
+
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    return index.iter_workload_pods(kind, name)
+
+def get_running_zone_counts(namespace, kind, name):
+    """Look up the running replicas per zone of a workload in the shared index, or return
+    None if it is not synced yet."""
+    if snapshot_reader_enabled():
+        shared = get_shared_namespace(namespace)
+        return shared["running_zones"].get(workload_key(kind, name)) if shared else None
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    return index.get_running_zone_counts(kind, name)
+
+def get_namespace_workload_counts(namespace):
+    """Return the running and per-zone pod counts of all workloads in a namespace from the
+    shared index, or None if it is not synced yet."""
+    if snapshot_reader_enabled():
+        shared = get_shared_namespace(namespace)
+        if shared is None:
+            return None
+        return {
+            tuple(key.split("/", 1)): (running, zone_counts)
+            for key, (running, zone_counts) in shared["workloads"].items()
+        }
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    return index.get_workload_counts()
+
+def get_pod_index_version(namespace):
+    """Return the resourceVersion of the last pod change in a namespace, or None if it is not cached."""
+    if snapshot_reader_enabled():
+        shared = get_shared_namespace(namespace)
+        return shared["version"] if shared else None
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    return index.informer.version()
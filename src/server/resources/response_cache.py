@@ -0,0 +1,183 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import os
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_MAX_BYTES = int(os.environ.get("RRS_RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+CACHE_MAX_ENTRY_BYTES = int(os.environ.get("RRS_RESPONSE_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+COMPRESSION = os.environ.get("RRS_RESPONSE_COMPRESSION", "true").lower() == "true"
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+def negotiate(accept_mimetypes, accept_encodings):
+    """Pick the (media type, content coding) of a response from the request's Accept and
+    Accept-Encoding headers, among the ones the installed libraries support."""
+    media = "json"
+    if msgpack is not None:
+        best = accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE, "application/x-msgpack"])
+        if best in (MSGPACK_MIMETYPE, "application/x-msgpack"):
+            media = "msgpack"
+
+    encodings = []
+    if COMPRESSION:
+        encodings = (["zstd"] if zstandard is not None else []) + ["gzip"]
+    encoding = accept_encodings.best_match(encodings + ["identity"]) or "identity"
+    return media, encoding
+
+def encode_variant(body, media, encoding):
+    """Convert an encoded JSON body to the negotiated media type and content coding.
+
+    Returns (body, content coding actually applied): bodies below COMPRESS_MIN_BYTES are
+    not compressed.
+    """
+    if media == "msgpack":
+        body = msgpack.packb(json.loads(body))
+    if encoding == "identity" or len(body) < COMPRESS_MIN_BYTES:
+        return body, "identity"
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), "zstd"
+    return gzip.compress(body, GZIP_LEVEL), "gzip"
+
+def variant_etag(etag, media, encoding):
+    """Strong ETag of one representation of a response."""
+    return etag + (f"-{media}" if media != "json" else "") + (f"-{encoding}" if encoding != "identity" else "")
+
+def variant_etags(etag):
+    """ETags of every representation of a response, to answer If-None-Match for any of them."""
+    return {
+        variant_etag(etag, media, encoding)
+        for media in ("json", "msgpack")
+        for encoding in ("identity", "gzip", "zstd")
+    }
+
+class CachedResponse:
+    """Encoded representations of a 200 response for one data version.
+
+    The JSON body is stored when the response is cached; the msgpack and compressed
+    variants are added the first time a client asks for them.
+    """
+
+    __slots__ = ("key", "version", "mimetype", "variants", "size")
+
+    def __init__(self, key, version, body, mimetype):
+        self.key = key
+        self.version = version
+        self.mimetype = mimetype
+        self.variants = {("json", "identity"): (body, "identity")}
+        self.size = len(body)
+
+class ResponseCache:
+    """LRU cache of encoded responses keyed by (path, query), bounded in bytes.
+
+    Each key holds the response of a single data version: looking a key up with a newer
+    version evicts the old entry, and storing a new version replaces it.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_entry_bytes=CACHE_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        """Return the entry of a key if it was built from this data version, else None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, version, body, mimetype):
+        """Store an encoded body, evicting the least recently used entries above the size
+        bound. Returns the entry, or None if the body is too large to be cached."""
+        if len(body) > self.max_entry_bytes:
+            return None
+        entry = CachedResponse(key, version, body, mimetype)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self.size += entry.size
+            self._evict()
+        return entry
+
+    def variant(self, entry, media, encoding):
+        """Return (body, content coding) of a representation of an entry, encoding and
+        caching it on first use. Non-JSON bodies are only served as they are."""
+        if entry.mimetype != JSON_MIMETYPE:
+            media, encoding = "json", "identity"
+        variant = entry.variants.get((media, encoding))
+        if variant is not None:
+            return variant
+
+        variant = encode_variant(entry.variants[("json", "identity")][0], media, encoding)
+        with self.lock:
+            if (media, encoding) not in entry.variants:
+                entry.variants[(media, encoding)] = variant
+                entry.size += len(variant[0])
+                if self.entries.get(entry.key) is entry:
+                    self.size += len(variant[0])
+                    self._evict()
+        return variant
+
+    def _evict(self):
+        while self.size > self.max_bytes and self.entries:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        self.size -= self.entries.pop(key).size
+
+_response_cache = ResponseCache()
+
+def get_response_cache():
+    """Return the process-wide response cache."""
+    return _response_cache
+
+def cache_key(path, args):
+    """Key of a request in the response cache."""
+    return path, tuple(sorted(args.items(multi=True)))
@@ -0,0 +1,113 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""Compiled critical service registry for the list endpoints.
+
+A ServiceIndex is built once per registry version: the services sorted by namespace and
+name, inverted indexes of the filterable fields, and the rows of a list view already
+grouped by namespace. Serving an unfiltered list then only serializes the prebuilt
+view; a filtered one intersects index buckets instead of scanning every service.
+"""
+
+import threading
+from resources.critical_services import get_configmap
+from resources.error_print import pretty_print_error
+from resources.pagination import paginate
+from resources.service_registry import get_registry
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+class ServiceIndex:
+    """Critical services of one registry version, indexed by name, by the value of each
+    filterable field and by namespace, with the rows of one list view."""
+
+    def __init__(self, services, row, fields):
+        self.services = services
+        self.fields = fields
+        self.keys = sorted((details["namespace"], name) for name, details in services.items())
+        self.namespaces = sorted({namespace for namespace, _ in self.keys})
+        self.by_field = {field: {} for field in fields}
+        for key in self.keys:
+            details = services[key[1]]
+            for field in fields:
+                self.by_field[field].setdefault(str(details.get(field)), []).append(key)
+        try:
+            self.rows = {name: row(name, details) for name, details in services.items()}
+            self.view = self.group(self.keys)
+        except Exception as e:
+            self.rows, self.view = None, {"error": pretty_print_error(str(e))}
+
+    def group(self, keys):
+        """Rows of the given (namespace, name) keys grouped by namespace."""
+        result = {"namespace": {}}
+        for namespace, name in keys:
+            result["namespace"].setdefault(namespace, []).append(self.rows[name])
+        return result
+
+    def select_keys(self, args):
+        """Keys of the page of services selected by the filters and limit/continue of the
+        query, with its continue token."""
+        keys = None
+        for field in self.fields:
+            wanted = args.get(field)
+            if wanted:
+                matched = set()
+                for value in wanted.split(","):
+                    matched.update(self.by_field[field].get(value, ()))
+                keys = matched if keys is None else keys & matched
+        return paginate(self.keys if keys is None else sorted(keys), lambda key: key, args)
+
+    def select_services(self, args):
+        """({name: details} of the page of services selected by the query, continue token)."""
+        keys, token = self.select_keys(args)
+        return {name: self.services[name] for _, name in keys}, token
+
+    def select(self, args):
+        """The list view of the page selected by the query, with its continue token. An
+        unfiltered, unpaginated query returns the prebuilt view itself."""
+        if not any(args.get(field) for field in self.fields + ("limit", "continue")):
+            return self.view, None
+        keys, token = self.select_keys(args)
+        if self.rows is None:
+            return self.view, token
+        return self.group(keys), token
+
+def get_service_index(cm_name, cm_namespace, cm_key, row, fields):
+    """Return the index of a registry for a list view, rebuilt only when the registry
+    version changes. Until the registry is cached it is built from a direct read."""
+    registry = get_registry(cm_name, cm_namespace, cm_key)
+    if registry is None:
+        return ServiceIndex(get_configmap(cm_name, cm_namespace, cm_key).get("critical-services", {}), row, fields)
+
+    data, version = registry
+    key = (cm_namespace, cm_name, cm_key, row)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    index = ServiceIndex(data.get("critical-services", {}), row, fields)
+    with _indexes_lock:
+        _indexes[key] = (version, index)
+    return index
@@ -0,0 +1,147 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""Critical service registry stored in one or more ConfigMaps.
+
+Unsharded, the registry is the JSON under the ConfigMap's key, as it always was. Once a
+manifest is stored under MANIFEST_KEY of that ConfigMap, the services live in the
+shard ConfigMaps it lists instead, each holding the services whose name hashes to it
+under the same key. A service is then read from, and written to, only its own shard.
+
+With RRS_REGISTRY_SHARDS set, the writer migrates an unsharded registry into that many
+shards on its next update. Services still found under the key of the base ConfigMap
+are read as part of the registry either way.
+"""
+
+import os
+import json
+import zlib
+import threading
+from kubernetes.client.exceptions import ApiException
+from resources.k8s_client import core_v1
+from resources.configmap_cache import get_cached_configmap
+
+HTTP_NOT_FOUND = 404
+MANIFEST_KEY = "critical-service-shards.json"
+REGISTRY_SHARDS = int(os.environ.get("RRS_REGISTRY_SHARDS", "0"))
+
+_merged = {}
+_merged_lock = threading.Lock()
+
+def shard_names(cm_name, count):
+    """Names of the shard ConfigMaps of a registry split into count shards."""
+    return [f"{cm_name}-{index}" for index in range(count)]
+
+def manifest_shards(manifest):
+    """Shard ConfigMap names listed by a parsed manifest, or None if it lists none."""
+    return (manifest or {}).get("shards") or None
+
+def shard_for(service_name, shards):
+    """The shard ConfigMap a service is stored in."""
+    return shards[zlib.crc32(service_name.encode()) % len(shards)]
+
+def load_key(data, key):
+    """Parse the JSON under a key of ConfigMap data, or None if the key is missing."""
+    return json.loads(data[key]) if data and key in data else None
+
+def _cached_shard(shard, cm_namespace, cm_key):
+    """(data, resourceVersion) of a cached shard; a missing shard is an empty one."""
+    try:
+        return get_cached_configmap(shard, cm_namespace, cm_key)
+    except ApiException as e:
+        if e.status != HTTP_NOT_FOUND:
+            raise
+        return {"critical-services": {}}, ""
+
+def _cached_shards(cm_name, cm_namespace):
+    cached = get_cached_configmap(cm_name, cm_namespace, MANIFEST_KEY)
+    return manifest_shards(cached[0]) if cached else None
+
+def get_registry(cm_name, cm_namespace, cm_key):
+    """Return (registry, version) from the watch cache, or None if it is not cached yet.
+
+    The registry of a sharded ConfigMap is the union of its shards, rebuilt only when one
+    of their resourceVersions changed; the version then joins all of them. It is shared
+    between readers and must not be modified.
+    """
+    base = get_cached_configmap(cm_name, cm_namespace, cm_key)
+    if base is None:
+        return None
+    shards = _cached_shards(cm_name, cm_namespace)
+    if not shards:
+        return base
+
+    parts = [base] + [_cached_shard(shard, cm_namespace, cm_key) for shard in shards]
+    if any(part is None for part in parts):
+        return None
+    version = ":".join(part[1] for part in parts)
+
+    key = (cm_namespace, cm_name, cm_key)
+    with _merged_lock:
+        cached = _merged.get(key)
+        if cached is None or cached[1] != version:
+            services = {}
+            for data, _ in parts:
+                services.update(data.get("critical-services", {}))
+            cached = ({"critical-services": services}, version)
+            _merged[key] = cached
+    return cached
+
+def get_registry_version(cm_name, cm_namespace, cm_key):
+    """Return the version of the cached registry, or None if it is not cached."""
+    registry = get_registry(cm_name, cm_namespace, cm_key)
+    return registry[1] if registry else None
+
+def read_registry(cm_name, cm_namespace, cm_key):
+    """Read a private copy of the registry from the apiserver."""
+    v1 = core_v1()
+    data = v1.read_namespaced_config_map(cm_name, cm_namespace).data or {}
+    services = dict((load_key(data, cm_key) or {}).get("critical-services", {}))
+    for shard in manifest_shards(load_key(data, MANIFEST_KEY)) or []:
+        try:
+            shard_data = v1.read_namespaced_config_map(shard, cm_namespace).data
+        except ApiException as e:
+            if e.status != HTTP_NOT_FOUND:
+                raise
+            continue
+        services.update((load_key(shard_data, cm_key) or {}).get("critical-services", {}))
+    return {"critical-services": services}
+
+def get_registry_service(cm_name, cm_namespace, cm_key, service_name):
+    """Return the entry of one service, or None if it is not registered.
+
+    From the watch cache only the base ConfigMap and the service's own shard are read.
+    """
+    base = get_cached_configmap(cm_name, cm_namespace, cm_key)
+    if base is None:
+        return read_registry(cm_name, cm_namespace, cm_key)["critical-services"].get(service_name)
+    service_info = base[0].get("critical-services", {}).get(service_name)
+    shards = _cached_shards(cm_name, cm_namespace)
+    if service_info is not None or not shards:
+        return service_info
+
+    shard = _cached_shard(shard_for(service_name, shards), cm_namespace, cm_key)
+    if shard is None:
+        return read_registry(cm_name, cm_namespace, cm_key)["critical-services"].get(service_name)
+    return shard[0].get("critical-services", {}).get(service_name)
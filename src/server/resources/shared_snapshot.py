@@ -0,0 +1,144 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import os
+import json
+import mmap
+import time
+import tempfile
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SNAPSHOT_MODE = os.environ.get("RRS_SNAPSHOT_MODE", "")
+SNAPSHOT_PATH = os.environ.get("RRS_SNAPSHOT_PATH",
+                               os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                                            "rrs-snapshot.json"))
+SNAPSHOT_WAIT_SECONDS = float(os.environ.get("RRS_INFORMER_SYNC_TIMEOUT", "10"))
+SNAPSHOT_MAX_AGE = float(os.environ.get("RRS_SNAPSHOT_MAX_AGE", "30"))
+# A snapshot not republished for this long comes from a publisher that is gone
+SNAPSHOT_STALE_SECONDS = 3 * SNAPSHOT_MAX_AGE
+SNAPSHOT_MISSING = "The shared snapshot has not been published yet"
+
+_reader_lock = threading.Lock()
+# Path of each snapshot file: (stat key of the decoded file, decoded data)
+_readers = {}
+_reader_waited = False
+
+def snapshot_reader_enabled():
+    """Whether this process serves the snapshot published by the collector process
+    instead of running its own informers and Ceph collector."""
+    return SNAPSHOT_MODE == "reader"
+
+def snapshot_part_path(part, path=None):
+    """Path of a separately published part of the snapshot, next to the main file.
+
+    Data that changes more often than the zone and service data (the event buffer), or
+    that only a few requests need (the pods of a namespace), is published in its own
+    file, so replacing it does not make every worker decode the main snapshot again.
+    """
+    root, ext = os.path.splitext(path or SNAPSHOT_PATH)
+    return f"{root}-{part}{ext}"
+
+def workload_key(kind, name):
+    """Key of a workload in the snapshot, which only has string keys."""
+    return f"{kind}/{name}"
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def _loads(buffer):
+    if orjson is not None:
+        return orjson.loads(buffer)
+    return json.loads(bytes(buffer))
+
+def publish_snapshot(data, path=None):
+    """Atomically replace the shared snapshot file with the serialized data.
+
+    The new snapshot is written next to the old one and renamed over it, so readers
+    always map either the previous or the new file in full.
+    """
+    path = path or SNAPSHOT_PATH
+    payload = _dumps(data)
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".rrs-snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(payload)
+
+def read_shared_snapshot(path=None):
+    """Return the last published snapshot, or None if none has been published yet or the
+    last one is older than SNAPSHOT_STALE_SECONDS.
+
+    The file is memory-mapped, so every worker reads the same tmpfs pages, and it is only
+    decoded again when the publisher has replaced it. The result is shared and read-only.
+
+    Readers are not zero-copy: each worker decodes a file once per published generation
+    and then serves the decoded objects. The handlers work on dicts and lists, so reading
+    fields in place from the mapped bytes would need a second, schema-bound format; the
+    publisher instead keeps the main file small and republishes it only when the data it
+    holds changes.
+    """
+    global _reader_waited
+    path = path or SNAPSHOT_PATH
+    reader_key, reader_data = _readers.get(path, (None, None))
+    deadline = None if _reader_waited else time.monotonic() + SNAPSHOT_WAIT_SECONDS
+    while True:
+        try:
+            st = os.stat(path)
+            break
+        except FileNotFoundError:
+            # Give a freshly started collector a moment to publish, once per process
+            if deadline is None or time.monotonic() >= deadline:
+                _reader_waited = True
+                return reader_data
+            time.sleep(0.1)
+    _reader_waited = True
+    if time.time() - st.st_mtime > SNAPSHOT_STALE_SECONDS:
+        return None
+
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if key == reader_key:
+        return reader_data
+    with _reader_lock:
+        reader_key, reader_data = _readers.get(path, (None, None))
+        if key != reader_key:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                    reader_data = _loads(view)
+            _readers[path] = ((st.st_ino, st.st_mtime_ns, st.st_size), reader_data)
+    return reader_data
@@ -0,0 +1,191 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import os
+import time
+import logging
+from kubernetes.client.exceptions import ApiException
+from resources.k8s_zones import get_k8s_zone_state, get_k8s_zone_version
+from resources.ceph_zones import get_ceph_collector, get_ceph_zone_state
+from resources.service_registry import get_registry
+from resources.pod_informer import get_pod_index
+from resources.critical_services import get_configured_instances
+from resources.workload_informer import get_workload_version
+from resources.health_events import get_event_broker
+from resources.shared_snapshot import (SNAPSHOT_MAX_AGE, SNAPSHOT_PATH, publish_snapshot, snapshot_part_path,
+                                       workload_key)
+from resources.status_monitor import start_status_monitor
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_INTERVAL = float(os.environ.get("RRS_SNAPSHOT_INTERVAL", "1"))
+
+CM_NAMESPACE = "rack-resiliency"
+CM_KEY = "critical-service-config.json"
+PUBLISHED_CONFIGMAPS = ("rrs-mon-static", "rrs-mon-dynamic")
+
+def snapshot_configmap(cm_name):
+    """Parsed critical service configuration of a ConfigMap, or None if it is not cached."""
+    try:
+        cached = get_registry(cm_name, CM_NAMESPACE, CM_KEY)
+    except ApiException as e:
+        if e.status == 404:
+            return {"missing": True}
+        raise
+    if cached is None:
+        return None
+    data, resource_version = cached
+    return {"resource_version": resource_version, "keys": {CM_KEY: data}}
+
+def snapshot_namespace(namespace, services):
+    """Pod counts and configured instances of the critical services of a namespace, or
+    None if its pod index has not synced."""
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    with index.lock:
+        version = index.informer.version()
+        counts = index.get_workload_counts()
+        workloads = {
+            workload_key(details["type"], name): counts.get((details["type"], name), (0, {}))
+            for name, details in services.items()
+        }
+        running_zones = {
+            workload_key(details["type"], name): index.get_running_zone_counts(details["type"], name)
+            for name, details in services.items()
+        }
+    types = {details["type"] for details in services.values()}
+    configured = get_configured_instances(namespace, types)
+    return {
+        "version": version,
+        "configured_version": get_workload_version(namespace, types),
+        "workloads": workloads,
+        "running_zones": running_zones,
+        "configured": {
+            workload_key(kind, name): instances
+            for (kind, name), instances in configured.items() if name in services
+        }
+    }
+
+def snapshot_namespace_pods(namespace, services):
+    """Pods of the critical services of a namespace, or None if its pod index has not synced."""
+    index = get_pod_index(namespace)
+    if not index.informer.wait_for_sync():
+        return None
+    with index.lock:
+        return {
+            "version": index.informer.version(),
+            "workloads": {
+                workload_key(details["type"], name): index.get_workload_pods(details["type"], name)
+                for name, details in services.items()
+            }
+        }
+
+def critical_services_by_namespace(configmaps):
+    """Group the services of the published rrs-mon-static by namespace."""
+    static = configmaps.get(f"{CM_NAMESPACE}/rrs-mon-static") or {}
+    services = static.get("keys", {}).get(CM_KEY, {}).get("critical-services", {})
+    by_namespace = {}
+    for name, details in services.items():
+        by_namespace.setdefault(details["namespace"], {})[name] = details
+    return by_namespace
+
+def snapshot_key(configmaps):
+    """Versions of the data in the main snapshot, read without copying the zone or pod
+    data. The Ceph collection time and the events are published separately and left out,
+    so a collection that found the same racks does not republish it."""
+    ceph = get_ceph_collector().snapshot
+    return (
+        get_k8s_zone_version(),
+        ceph.digest if ceph is not None else None,
+        tuple((configmap or {}).get("resource_version") for configmap in configmaps.values()),
+        tuple((get_pod_index(namespace).informer.version(),
+               get_workload_version(namespace, {details["type"] for details in services.values()}))
+              for namespace, services in sorted(critical_services_by_namespace(configmaps).items()))
+    )
+
+def build_snapshot(configmaps):
+    """Collect the zone, ConfigMap and critical service data served by the workers."""
+    k8s_version, k8s_zones = get_k8s_zone_state()
+    ceph_digest, ceph_zones = get_ceph_zone_state()
+    return {
+        "k8s": {"version": k8s_version, "data": k8s_zones},
+        "ceph": {"digest": ceph_digest, "data": ceph_zones},
+        "configmaps": configmaps,
+        "namespaces": {
+            namespace: snapshot_namespace(namespace, services)
+            for namespace, services in critical_services_by_namespace(configmaps).items()
+        }
+    }
+
+def build_live_snapshot():
+    """Collect the event buffer and the Ceph collection time, which change on their own."""
+    ceph = get_ceph_collector().snapshot
+    return {
+        "ceph_fetched_at": ceph.fetched_at if ceph is not None else None,
+        "events": get_event_broker().snapshot()
+    }
+
+def snapshot_parts(configmaps, path):
+    """(path, key, build) of every snapshot file: the main snapshot, the live part and
+    the pods of each namespace with critical services."""
+    ceph = get_ceph_collector().snapshot
+    parts = [
+        (path, snapshot_key(configmaps), lambda: build_snapshot(configmaps)),
+        (snapshot_part_path("live", path), (ceph.fetched_at if ceph is not None else None,
+                                            get_event_broker().last_id), build_live_snapshot)
+    ]
+    for namespace, services in sorted(critical_services_by_namespace(configmaps).items()):
+        parts.append((snapshot_part_path(f"pods-{namespace}", path), get_pod_index(namespace).informer.version(),
+                      lambda namespace=namespace, services=services: snapshot_namespace_pods(namespace, services)))
+    return parts
+
+def run_publisher(path=None):
+    """Publish each snapshot file whenever one of its upstream versions changes, and at
+    least every RRS_SNAPSHOT_MAX_AGE seconds so readers can tell that the publisher is alive."""
+    start_status_monitor()
+    path = path or SNAPSHOT_PATH
+    generation = 0
+    # Path of each snapshot file: (key it was built from, time it was published)
+    published = {}
+    while True:
+        try:
+            configmaps = {f"{CM_NAMESPACE}/{name}": snapshot_configmap(name) for name in PUBLISHED_CONFIGMAPS}
+            for part_path, key, build in snapshot_parts(configmaps, path):
+                last_key, last_published = published.get(part_path, (None, 0))
+                if key == last_key and time.monotonic() - last_published < SNAPSHOT_MAX_AGE:
+                    continue
+                snapshot = build()
+                if snapshot is None:
+                    continue
+                generation += 1
+                snapshot["generation"] = generation
+                snapshot["published_at"] = time.time()
+                size = publish_snapshot(snapshot, part_path)
+                published[part_path] = (key, time.monotonic())
+                logger.debug("Published %s generation %d (%d bytes)", part_path, generation, size)
+        except Exception as e:
+            logger.warning("Failed to publish the shared snapshot: %s", e)
+        time.sleep(PUBLISH_INTERVAL)
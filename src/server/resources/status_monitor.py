@@ -0,0 +1,190 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Monitor that publishes the status and zone balance of the critical services to
+rrs-mon-dynamic.
+
+The status is recomputed from the pod indexes and workload informers whenever a
+registry, node, pod or workload version changes. A new result is only written once it has stopped changing for
+RRS_STATUS_DEBOUNCE seconds (or has been pending for RRS_STATUS_MAX_DELAY), at most once
+every RRS_STATUS_MIN_PATCH_INTERVAL seconds, so a burst of pod events during a rack drain
+ends up as one patch. Only the services whose status or balance changed are written: their
+fields are merged into the existing entries through the ConfigMap writer, in the shard
+each service belongs to and guarded by the shard's resourceVersion, so fields and
+services maintained by other writers are kept.
+"""
+
+import os
+import time
+import logging
+import threading
+from resources.k8s_zones import get_k8s_zone_version
+from resources.service_registry import get_registry
+from resources.pod_informer import get_namespace_workload_counts, get_pod_index_version
+from resources.critical_services import get_configured_instances
+from resources.workload_informer import get_workload_version
+from resources.zone_balance import get_service_balance, topology_zones
+from resources.configmap_writer import get_configmap_writer
+from resources.shared_snapshot import snapshot_reader_enabled
+
+logger = logging.getLogger(__name__)
+
+STATUS_MONITOR = os.environ.get("RRS_STATUS_MONITOR", "false").lower() == "true"
+POLL_INTERVAL = float(os.environ.get("RRS_STATUS_POLL_INTERVAL", "1"))
+DEBOUNCE_SECONDS = float(os.environ.get("RRS_STATUS_DEBOUNCE", "2"))
+MAX_DELAY_SECONDS = float(os.environ.get("RRS_STATUS_MAX_DELAY", "30"))
+MIN_PATCH_INTERVAL = float(os.environ.get("RRS_STATUS_MIN_PATCH_INTERVAL", "10"))
+
+CM_NAMESPACE = "rack-resiliency"
+CM_KEY = "critical-service-config.json"
+STATIC_CM = "rrs-mon-static"
+DYNAMIC_CM = "rrs-mon-dynamic"
+
+def service_status(configured, running):
+    """Status of a service from its configured and running instances."""
+    if not running:
+        return "NotConfigured"
+    if configured is not None and running < configured:
+        return "PartiallyConfigured"
+    return "Configured"
+
+def compute_status(services):
+    """Status and zone balance fields of each critical service, or None until the pods of
+    all their namespaces are indexed."""
+    by_namespace = {}
+    for name, details in services.items():
+        by_namespace.setdefault(details["namespace"], {})[name] = details
+
+    zones = topology_zones()
+    result = {}
+    for namespace, namespace_services in sorted(by_namespace.items()):
+        counts = get_namespace_workload_counts(namespace)
+        if counts is None:
+            return None
+        configured = get_configured_instances(namespace, {details["type"] for details in namespace_services.values()})
+        for name, details in namespace_services.items():
+            key = (details["type"], name)
+            running = counts.get(key, (0, {}))[0]
+            balance = get_service_balance(namespace, details["type"], name, zones) or {
+                "balanced": "NA", "min_replicas_per_zone": None, "single_zone_risk": None}
+            result[name] = {
+                "namespace": namespace,
+                "type": details["type"],
+                "status": service_status(configured.get(key), running),
+                **balance
+            }
+    return result
+
+class StatusMonitor:
+    """Recompute the critical service status on upstream changes and publish it to
+    rrs-mon-dynamic, debounced, rate limited and only for the services that changed."""
+
+    def __init__(self):
+        self.key = None
+        self.pending = None
+        self.first_change = None
+        self.last_change = None
+        self.published = {}
+        self.patched_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the background monitor thread once."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="status-monitor", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Critical service status monitor failed: %s", e)
+            time.sleep(POLL_INTERVAL)
+
+    def poll(self, now=None):
+        """Recompute the status if an upstream version changed, and publish a pending
+        change once it has settled."""
+        now = time.monotonic() if now is None else now
+        registry = get_registry(STATIC_CM, CM_NAMESPACE, CM_KEY)
+        if registry is None:
+            return
+        services, version = registry[0].get("critical-services", {}), registry[1]
+        types = {}
+        for details in services.values():
+            types.setdefault(details["namespace"], set()).add(details["type"])
+        key = (version, get_k8s_zone_version()) + tuple(
+            (get_pod_index_version(namespace), get_workload_version(namespace, types[namespace]))
+            for namespace in sorted(types))
+
+        if key != self.key:
+            status = compute_status(services)
+            if status is None:
+                return
+            self.key = key
+            if status != self.pending:
+                self.pending = status
+                self.last_change = now
+                if self.first_change is None:
+                    self.first_change = now
+
+        if self.first_change is None:
+            return
+        if now - self.last_change < DEBOUNCE_SECONDS and now - self.first_change < MAX_DELAY_SECONDS:
+            return
+        if self.patched_at is not None and now - self.patched_at < MIN_PATCH_INTERVAL:
+            return
+        if self.publish(self.pending):
+            self.patched_at = now
+        self.first_change = self.last_change = None
+
+    def publish(self, status):
+        """Merge the services whose fields differ from the last published ones into
+        rrs-mon-dynamic, and return whether it was patched."""
+        changes = {name: fields for name, fields in status.items() if self.published.get(name) != fields}
+        if not changes:
+            return False
+        patched = get_configmap_writer(DYNAMIC_CM, CM_NAMESPACE, CM_KEY).update_services(changes)
+        self.published.update(changes)
+        if patched:
+            logger.info("Published the status of %d critical services", len(patched))
+        return bool(patched)
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+def start_status_monitor():
+    """Start the status monitor when RRS_STATUS_MONITOR is enabled, in the process that
+    runs the informers."""
+    global _monitor
+    if not STATUS_MONITOR or snapshot_reader_enabled():
+        return None
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = StatusMonitor()
+    _monitor.start()
+    return _monitor
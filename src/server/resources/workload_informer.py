@@ -0,0 +1,106 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import threading
+from functools import partial
+from resources.k8s_client import watch_apps_v1
+from resources.informer import Informer, Record
+from resources.pod_informer import get_shared_namespace
+from resources.shared_snapshot import snapshot_reader_enabled
+
+WORKLOAD_TYPES = ("Deployment", "StatefulSet", "DaemonSet")
+LIST_FUNCS = {
+    "Deployment": "list_namespaced_deployment",
+    "StatefulSet": "list_namespaced_stateful_set",
+    "DaemonSet": "list_namespaced_daemon_set",
+}
+
+_workload_informers = {}
+_workload_informers_lock = threading.Lock()
+
+def configured_instances_of(resource_type, workload):
+    """Configured instances of a workload object."""
+    if resource_type == "DaemonSet":
+        return workload.status.desired_number_scheduled
+    return workload.spec.replicas
+
+class WorkloadRecord(Record):
+    """The fields of a workload used for critical service lookups."""
+
+    __slots__ = ("name", "instances")
+
+    def __init__(self, name, instances):
+        self.name = name
+        self.instances = instances
+
+def workload_record(resource_type, workload):
+    """Reduce a workload object to its configured instances."""
+    return WorkloadRecord(workload.metadata.name, configured_instances_of(resource_type, workload))
+
+def raw_workload_record(resource_type, workload):
+    """Reduce a workload dict of a raw list response to a workload record."""
+    if resource_type == "DaemonSet":
+        instances = (workload.get("status") or {}).get("desiredNumberScheduled")
+    else:
+        instances = (workload.get("spec") or {}).get("replicas")
+    return WorkloadRecord(workload["metadata"]["name"], instances)
+
+def get_workload_informer(namespace, resource_type):
+    """Return the shared informer of the workloads of one type in a namespace, starting it
+    on first use."""
+    with _workload_informers_lock:
+        informer = _workload_informers.get((namespace, resource_type))
+        if informer is None:
+            informer = Informer(f"{resource_type}/{namespace}", getattr(watch_apps_v1(), LIST_FUNCS[resource_type]),
+                                partial(workload_record, resource_type), partial(raw_workload_record, resource_type),
+                                namespace=namespace)
+            _workload_informers[(namespace, resource_type)] = informer
+    informer.start()
+    return informer
+
+def get_namespace_configured(namespace, resource_types):
+    """Configured instances of every workload of the given types in a namespace,
+    {(type, name): instances}, or None until their informers have synced."""
+    configured = {}
+    for resource_type in resource_types:
+        if resource_type not in WORKLOAD_TYPES:
+            continue
+        informer = get_workload_informer(namespace, resource_type)
+        if not informer.wait_for_sync():
+            return None
+        with informer.lock:
+            for name, record in informer.store.items():
+                configured[(resource_type, name)] = record.instances
+    return configured
+
+def get_workload_version(namespace, resource_types):
+    """Return the resourceVersions of the last changes of the workloads of the given types
+    in a namespace, or None if they are not cached."""
+    if snapshot_reader_enabled():
+        shared = get_shared_namespace(namespace)
+        return shared.get("configured_version") if shared else None
+    versions = tuple(get_workload_informer(namespace, resource_type).version()
+                     for resource_type in sorted(set(resource_types)) if resource_type in WORKLOAD_TYPES)
+    return None if None in versions else versions
@@ -0,0 +1,85 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Zone balance of the critical services, read live from the pod indexes.
+
+Every pod index keeps the running replicas of its workloads per topology zone, updated
+from the pod and node events, so the balance of a service is derived from one row of
+that matrix and the list of zones without walking any pods.
+"""
+
+from resources.k8s_zones import get_k8s_zone_state, get_k8s_zone_version
+from resources.pod_informer import get_running_zone_counts, get_pod_index_version
+
+def topology_zones():
+    """Names of the Kubernetes topology zones that have nodes."""
+    zones = get_k8s_zone_state()[1]
+    if not isinstance(zones, dict) or "error" in zones:
+        return ()
+    return tuple(sorted(zones))
+
+def zone_balance(resource_type, zone_counts, zones):
+    """Balance of a service from its running replicas per zone.
+
+    A DaemonSet is balanced when every zone runs a replica, other workloads when they
+    have running replicas and the replica counts of the zones differ by at most one.
+    single_zone_risk is set when the loss of one zone would leave the service without a
+    running replica.
+    """
+    counts = [zone_counts.get(zone, 0) for zone in zones]
+    min_replicas = min(counts)
+    if resource_type == "DaemonSet":
+        balanced = min_replicas > 0
+    else:
+        balanced = max(counts) > 0 and max(counts) - min_replicas <= 1
+    return {
+        "balanced": "true" if balanced else "false",
+        "min_replicas_per_zone": min_replicas,
+        "single_zone_risk": sum(1 for count in counts if count) <= 1
+    }
+
+def get_service_balance(namespace, resource_type, name, zones):
+    """Live balance of a service, or None if its namespace is not indexed yet."""
+    zone_counts = get_running_zone_counts(namespace, resource_type, name)
+    if zone_counts is None or not zones:
+        return None
+    return zone_balance(resource_type, zone_counts, zones)
+
+def get_balance_version(namespaces):
+    """Version of the balance of the services of the given namespaces: the node and
+    per-namespace pod resourceVersions, or None if one of them is not cached."""
+    versions = (get_k8s_zone_version(),) + tuple(get_pod_index_version(namespace) for namespace in namespaces)
+    return None if None in versions else versions
+
+def with_live_balance(services):
+    """Copy of the services with their balanced flag, minimum replicas per zone and
+    single zone risk read live. A service whose namespace is not indexed yet keeps the
+    balanced flag it was configured with."""
+    zones = topology_zones()
+    result = {}
+    for name, details in services.items():
+        balance = get_service_balance(details["namespace"], details["type"], name, zones)
+        result[name] = {**details, **balance} if balance else details
+    return result
@@ -0,0 +1,113 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+import threading
+from types import MappingProxyType
+from resources.k8s_zones import get_k8s_zone_state, get_k8s_zone_version
+from resources.ceph_zones import get_ceph_zone_state, get_ceph_zone_version
+
+_topology = None
+_generation = 0
+_topology_lock = threading.Lock()
+
+class ZoneEntry:
+    """Nodes of one zone, as read-only tuples."""
+    __slots__ = ("name", "masters", "workers", "storage")
+
+    def __init__(self, name, masters, workers, storage):
+        self.name = name
+        self.masters = masters
+        self.workers = workers
+        self.storage = storage
+
+class ZoneTopology:
+    """Immutable join of the Kubernetes topology zones and the Ceph racks.
+
+    Built once per change of either source and shared by the zone endpoints. `zones`
+    maps a zone name to its ZoneEntry and `node_counts` holds the totals; masters and
+    workers are (name, status) tuples and storage nodes are (name, status, OSD names
+    grouped by status) tuples. `error` is set when a source failed, and
+    `k8s_configured`/`ceph_configured` are False when a source reported no zones at all.
+    """
+
+    def __init__(self, generation, key, k8s_zones, ceph_zones):
+        self.generation = generation
+        self.key = key
+        self.error = None
+        self.k8s_configured = not isinstance(k8s_zones, str)
+        self.ceph_configured = not isinstance(ceph_zones, str)
+
+        if isinstance(k8s_zones, dict) and "error" in k8s_zones:
+            self.error = k8s_zones["error"]
+        elif isinstance(ceph_zones, dict) and "error" in ceph_zones:
+            self.error = ceph_zones["error"]
+
+        zones = {}
+        if self.error is None and self.k8s_configured and self.ceph_configured:
+            for zone_name in sorted(set(k8s_zones) | set(ceph_zones)):
+                k8s_zone = k8s_zones.get(zone_name, {})
+                zones[zone_name] = ZoneEntry(
+                    zone_name,
+                    tuple((node["name"], node["status"]) for node in k8s_zone.get("masters", [])),
+                    tuple((node["name"], node["status"]) for node in k8s_zone.get("workers", [])),
+                    tuple((node["name"], node["status"], _group_osds(node.get("osds", [])))
+                          for node in ceph_zones.get(zone_name, []))
+                )
+        self.zones = MappingProxyType(zones)
+        self.node_counts = MappingProxyType({
+            "masters": sum(len(entry.masters) for entry in zones.values()),
+            "workers": sum(len(entry.workers) for entry in zones.values()),
+            "storage": sum(len(entry.storage) for entry in zones.values())
+        })
+
+def _group_osds(osds):
+    """Group OSD names by their status."""
+    osd_status_map = {}
+    for osd in osds:
+        osd_status_map.setdefault(osd["status"], []).append(osd["name"])
+    return MappingProxyType({status: tuple(names) for status, names in osd_status_map.items()})
+
+def get_zone_topology(k8s_state=None, ceph_state=None):
+    """Return the current zone topology, rebuilding it only when the k8s or Ceph data changed.
+
+    The (version, data) states of both sources are read here unless the caller already
+    fetched them, as the async server does.
+    """
+    global _topology, _generation
+    k8s_version, k8s_zones = k8s_state or get_k8s_zone_state()
+    ceph_version, ceph_zones = ceph_state or get_ceph_zone_state()
+    key = (k8s_version, ceph_version)
+
+    with _topology_lock:
+        if _topology is not None and None not in key and _topology.key == key:
+            return _topology
+        _generation += 1
+        _topology = ZoneTopology(_generation, key, k8s_zones, ceph_zones)
+        return _topology
+
+def get_zone_topology_version():
+    """Return the (k8s, Ceph) data version the topology is built from, or None if either is not cached."""
+    key = (get_k8s_zone_version(), get_ceph_zone_version())
+    return None if None in key else key
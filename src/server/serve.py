@@ -0,0 +1,100 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Production entry point: one snapshot publisher process and a pool of gunicorn workers.
+
+The publisher runs the informers and the Ceph collector and publishes their data to a
+shared memory file. The workers only read that file, so the load on the apiserver and
+on Ceph does not grow with RRS_WORKERS. The publisher is restarted whenever it exits.
+"""
+
+import os
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("RRS_WORKERS", "4"))
+THREADS = int(os.environ.get("RRS_THREADS", "8"))
+BIND = os.environ.get("RRS_BIND", "0.0.0.0:80")
+WORKER_TIMEOUT = int(os.environ.get("RRS_WORKER_TIMEOUT", "60"))
+PUBLISHER_RESTART_DELAY = 5
+
+def run_publisher():
+    """Run the informers and the Ceph collector, publishing the shared snapshot."""
+    # A publisher restarted after gunicorn started is forked with the arbiter's handlers
+    for signum in Arbiter.SIGNALS + [signal.SIGCHLD]:
+        signal.signal(signum, signal.SIG_DFL)
+    os.environ.pop("RRS_SNAPSHOT_MODE", None)
+    from resources.snapshot_publisher import run_publisher as publish
+    publish()
+
+def supervise_publisher():
+    """Run the publisher process and start a new one whenever it exits.
+
+    Gunicorn's arbiter reaps every child of the master, the publisher included, so its
+    end is detected with the process sentinel instead of its exit status.
+    """
+    while True:
+        publisher = multiprocessing.Process(target=run_publisher, name="rrs-snapshot-publisher", daemon=True)
+        publisher.start()
+        wait([publisher.sentinel])
+        logger.warning("Snapshot publisher exited, restarting it in %d seconds", PUBLISHER_RESTART_DELAY)
+        time.sleep(PUBLISHER_RESTART_DELAY)
+
+class RRSApplication(BaseApplication):
+    """Gunicorn application serving the Flask app from the shared snapshot."""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Imported in each worker, after RRS_SNAPSHOT_MODE has been set
+        from app import app
+        return app
+
+if __name__ == "__main__":
+    threading.Thread(target=supervise_publisher, name="publisher-supervisor", daemon=True).start()
+
+    os.environ["RRS_SNAPSHOT_MODE"] = "reader"
+    RRSApplication({
+        "bind": BIND,
+        "workers": WORKERS,
+        # Threads per worker, so open /events streams do not block a whole worker
+        "threads": THREADS,
+        "timeout": WORKER_TIMEOUT,
+        "preload_app": False,
+    }).run()
@@ -0,0 +1,126 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Fixtures shared by the tests: the server modules on sys.path and a fake CoreV1Api
+holding ConfigMaps with resourceVersions."""
+
+import os
+import sys
+import threading
+import pytest
+from kubernetes import client
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "server"))
+
+from resources import configmap_cache, configmap_writer, informer, k8s_client, service_registry
+
+NAMESPACE = "rack-resiliency"
+CM_KEY = "critical-service-config.json"
+
+class FakeCoreV1Api:
+    """ConfigMaps of one namespace, patched with the apiserver's optimistic concurrency:
+    a patch carrying a stale resourceVersion fails with 409 Conflict."""
+
+    def __init__(self):
+        self.configmaps = {}
+        self.calls = []
+        self.lock = threading.Lock()
+        # Called as hook(name, body) before a patch is applied, e.g. to write concurrently
+        self.before_patch = None
+
+    def set(self, name, data):
+        """Store a ConfigMap as another writer would, bumping its resourceVersion."""
+        with self.lock:
+            version = self.configmaps[name][0] + 1 if name in self.configmaps else 1
+            self.configmaps[name] = (version, dict(data))
+
+    def data(self, name):
+        return self.configmaps[name][1]
+
+    def patches(self, name=None):
+        return [call for call in self.calls if call[0] == "patch" and name in (None, call[1])]
+
+    def _object(self, name):
+        version, data = self.configmaps[name]
+        return client.V1ConfigMap(metadata=client.V1ObjectMeta(name=name, resource_version=str(version)),
+                                  data=dict(data))
+
+    def read_namespaced_config_map(self, name, namespace):
+        with self.lock:
+            self.calls.append(("read", name))
+            if name not in self.configmaps:
+                raise client.exceptions.ApiException(status=404, reason="Not Found")
+            return self._object(name)
+
+    def create_namespaced_config_map(self, namespace, body):
+        name = body["metadata"]["name"]
+        with self.lock:
+            self.calls.append(("create", name))
+            if name in self.configmaps:
+                raise client.exceptions.ApiException(status=409, reason="AlreadyExists")
+            self.configmaps[name] = (1, dict(body["data"]))
+
+    def patch_namespaced_config_map(self, name, namespace, body):
+        if self.before_patch is not None:
+            self.before_patch(name, body)
+        with self.lock:
+            self.calls.append(("patch", name))
+            version, data = self.configmaps[name]
+            expected = body.get("metadata", {}).get("resourceVersion")
+            if expected is not None and expected != str(version):
+                raise client.exceptions.ApiException(status=409, reason="Conflict")
+            self.configmaps[name] = (version + 1, {**data, **body["data"]})
+
+    def list_namespaced_config_map(self, namespace, field_selector=None, limit=None, _continue=None, **kwargs):
+        name = field_selector.split("=", 1)[1]
+        with self.lock:
+            items = [self._object(name)] if name in self.configmaps else []
+            version = max([entry[0] for entry in self.configmaps.values()] or [1])
+        return client.V1ConfigMapList(items=items, metadata=client.V1ListMeta(resource_version=str(version)))
+
+class IdleWatch:
+    """Watch that never delivers an event, so the informers serve their initial list."""
+
+    def stream(self, func, **kwargs):
+        threading.Event().wait()
+        yield from ()
+
+def _clear_caches():
+    configmap_cache._configmap_informers.clear()
+    configmap_cache._parsed.clear()
+    service_registry._merged.clear()
+    configmap_writer._writers.clear()
+
+@pytest.fixture
+def fake_core(monkeypatch):
+    """A FakeCoreV1Api behind every CoreV1Api of the server, with fresh caches."""
+    fake = FakeCoreV1Api()
+    monkeypatch.setattr(k8s_client, "get_api_client", lambda: None)
+    monkeypatch.setattr(k8s_client, "get_watch_api_client", lambda: None)
+    monkeypatch.setattr(client, "CoreV1Api", lambda api_client=None: fake)
+    monkeypatch.setattr(informer.watch, "Watch", IdleWatch)
+    _clear_caches()
+    yield fake
+    _clear_caches()
@@ -0,0 +1,129 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Tests of the coalescing ConfigMap writer behind PATCH /criticalservices."""
+
+import json
+import time
+import threading
+from resources import configmap_writer
+from resources.configmap_writer import get_configmap_writer
+from conftest import CM_KEY, NAMESPACE
+
+CM_NAME = "rrs-mon-static"
+
+def registry(*names):
+    return {CM_KEY: json.dumps({"critical-services": {
+        name: {"namespace": "services", "type": "Deployment"} for name in names}})}
+
+def services(fake, name=CM_NAME):
+    return json.loads(fake.data(name)[CM_KEY])["critical-services"]
+
+def submit_concurrently(writer, requests):
+    """Submit every request from its own thread at the same time and return the results."""
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def submit(index):
+        barrier.wait()
+        results[index] = writer.submit(requests[index])
+
+    threads = [threading.Thread(target=submit, args=(index,)) for index in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+def test_concurrent_submits_coalesce_into_one_guarded_patch(fake_core, monkeypatch):
+    monkeypatch.setattr(configmap_writer, "BATCH_WINDOW_SECONDS", 0.5)
+    fake_core.set(CM_NAME, registry("a"))
+    requests = [{f"svc-{index}": {"namespace": "services", "type": "Deployment"}} for index in range(8)]
+    requests.append({"a": {"namespace": "services", "type": "Deployment"}})
+
+    results = submit_concurrently(get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY), requests)
+
+    assert len(fake_core.patches()) == 1
+    assert sorted(services(fake_core)) == ["a"] + [f"svc-{index}" for index in range(8)]
+    for index, result in enumerate(results[:-1]):
+        assert result == {"Update": "Successful", "Successfully Added Services": [f"svc-{index}"]}
+    assert results[-1] == {"Update": "Services Already Exist", "Already Existing Services": ["a"]}
+
+def test_requests_queued_during_a_write_are_written_by_one_more_patch(fake_core, monkeypatch):
+    monkeypatch.setattr(configmap_writer, "BATCH_WINDOW_SECONDS", 0)
+    fake_core.set(CM_NAME, registry())
+    writer = get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY)
+    patching, release = threading.Event(), threading.Event()
+
+    def hold_first_patch(name, body):
+        if not patching.is_set():
+            patching.set()
+            release.wait(10)
+    fake_core.before_patch = hold_first_patch
+
+    first = threading.Thread(target=writer.submit, args=({"first": {"namespace": "services", "type": "Deployment"}},))
+    first.start()
+    patching.wait(10)
+    queued = [threading.Thread(target=writer.submit, args=({name: {"namespace": "services", "type": "Deployment"}},))
+              for name in ("second", "third")]
+    for thread in queued:
+        thread.start()
+    while len(writer.pending) < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in [first] + queued:
+        thread.join(10)
+
+    assert len(fake_core.patches()) == 2
+    assert sorted(services(fake_core)) == ["first", "second", "third"]
+    assert not writer.writing
+
+def test_conflict_is_retried_on_a_fresh_read(fake_core):
+    fake_core.set(CM_NAME, registry("a"))
+
+    def concurrent_write(name, body):
+        # Another writer adds a service between our read and our patch, once
+        fake_core.before_patch = None
+        fake_core.set(CM_NAME, registry("a", "other"))
+    fake_core.before_patch = concurrent_write
+
+    result = get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY).submit(
+        {"new": {"namespace": "services", "type": "Deployment"}})
+
+    assert result == {"Update": "Successful", "Successfully Added Services": ["new"]}
+    assert len(fake_core.patches()) == 2
+    assert sorted(services(fake_core)) == ["a", "new", "other"]
+
+def test_persistent_conflicts_fail_the_update(fake_core, monkeypatch):
+    monkeypatch.setattr(configmap_writer, "MAX_CONFLICT_RETRIES", 2)
+    fake_core.set(CM_NAME, registry("a"))
+    fake_core.before_patch = lambda name, body: fake_core.set(CM_NAME, registry("a"))
+
+    result = get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY).submit(
+        {"new": {"namespace": "services", "type": "Deployment"}})
+
+    assert "error" in result
+    assert len(fake_core.patches()) == 3
+    assert sorted(services(fake_core)) == ["a"]
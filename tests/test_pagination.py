@@ -0,0 +1,91 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Tests of the chunked upstream lists and the continue tokens of the list endpoints."""
+
+import json
+import types
+import pytest
+from kubernetes import client
+from resources.pagination import (PaginationError, list_in_chunks, list_raw_in_chunks, paginate, parse_limit,
+                                  PageIterator)
+
+def fake_list(names):
+    """A list call serving names in pages, with the apiserver's continue tokens."""
+    calls = []
+
+    def list_func(limit=None, _continue=None, _preload_content=True, **kwargs):
+        calls.append({"limit": limit, "_continue": _continue, **kwargs})
+        start = int(_continue) if _continue else 0
+        end = start + limit
+        token = str(end) if end < len(names) else None
+        items = names[start:end]
+        if not _preload_content:
+            body = json.dumps({"metadata": {"resourceVersion": "7", "continue": token},
+                               "items": [{"metadata": {"name": name}} for name in items]})
+            return types.SimpleNamespace(data=body.encode(), release_conn=lambda: None)
+        return client.V1PodList(items=[client.V1Pod(metadata=client.V1ObjectMeta(name=name)) for name in items],
+                                metadata=client.V1ListMeta(resource_version="7", _continue=token))
+
+    return list_func, calls
+
+def test_list_in_chunks_follows_continue_tokens():
+    names = [f"pod-{index}" for index in range(7)]
+    list_func, calls = fake_list(names)
+    assert [pod.metadata.name for pod in list_in_chunks(list_func, limit=3, namespace="services")] == names
+    assert [call["_continue"] for call in calls] == [None, "3", "6"]
+    assert all(call["limit"] == 3 and call["namespace"] == "services" for call in calls)
+
+def test_list_raw_in_chunks_follows_continue_tokens():
+    names = [f"pod-{index}" for index in range(6)]
+    list_func, calls = fake_list(names)
+    assert [pod["metadata"]["name"] for pod in list_raw_in_chunks(list_func, limit=3)] == names
+    assert [call["_continue"] for call in calls] == [None, "3"]
+
+def test_paginate_resumes_after_the_continue_token():
+    items = [{"name": f"svc-{index}"} for index in range(5)]
+    key = lambda item: (item["name"],)
+    page, token = paginate(items, key, {"limit": "2"})
+    assert [item["name"] for item in page] == ["svc-0", "svc-1"]
+
+    # An item removed before the token does not shift the next page
+    page, token = paginate(items[1:], key, {"limit": "2", "continue": token})
+    assert [item["name"] for item in page] == ["svc-2", "svc-3"]
+    page, token = paginate(items, key, {"limit": "2", "continue": token})
+    assert [item["name"] for item in page] == ["svc-4"]
+    assert token is None
+
+def test_paginate_without_limit_returns_everything():
+    items = [{"name": f"svc-{index}"} for index in range(3)]
+    assert paginate(items, lambda item: (item["name"],), {}) == (items, None)
+
+@pytest.mark.parametrize("args", [{"limit": "0"}, {"limit": "abc"}, {"continue": "not a token"}])
+def test_invalid_pagination_parameters(args):
+    with pytest.raises(PaginationError):
+        PageIterator([], lambda item: (item,), args)
+
+def test_parse_limit():
+    assert parse_limit({}) is None
+    assert parse_limit({"limit": "5"}) == 5
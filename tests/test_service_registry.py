@@ -0,0 +1,102 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Tests of the sharded critical service registry: migration by the writer and reads
+through the watch cache."""
+
+import json
+from resources import configmap_writer
+from resources.configmap_writer import get_configmap_writer
+from resources.service_registry import (MANIFEST_KEY, get_registry, get_registry_service, read_registry, shard_for,
+                                        shard_names)
+from conftest import CM_KEY, NAMESPACE
+
+CM_NAME = "rrs-mon-static"
+
+def entry(namespace="services"):
+    return {"namespace": namespace, "type": "Deployment"}
+
+def registry(services):
+    return {CM_KEY: json.dumps({"critical-services": services})}
+
+def stored(fake, name):
+    return json.loads(fake.data(name)[CM_KEY])["critical-services"]
+
+def test_shard_for_is_stable_and_uses_every_shard():
+    shards = shard_names(CM_NAME, 4)
+    assert shards == [f"{CM_NAME}-{index}" for index in range(4)]
+    names = [f"svc-{index}" for index in range(64)]
+    assert [shard_for(name, shards) for name in names] == [shard_for(name, list(shards)) for name in names]
+    assert {shard_for(name, shards) for name in names} == set(shards)
+
+def test_migrated_layout_round_trips_through_get_registry(fake_core, monkeypatch):
+    monkeypatch.setattr(configmap_writer, "REGISTRY_SHARDS", 3)
+    fake_core.set(CM_NAME, registry({name: entry() for name in ("a", "b", "c")}))
+
+    result = get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY).submit({"d": entry("other")})
+
+    assert result == {"Update": "Successful", "Successfully Added Services": ["d"]}
+    shards = shard_names(CM_NAME, 3)
+    assert json.loads(fake_core.data(CM_NAME)[MANIFEST_KEY]) == {"shards": shards}
+    assert stored(fake_core, CM_NAME) == {}
+    for name in ("a", "b", "c", "d"):
+        assert name in stored(fake_core, shard_for(name, shards))
+
+    data, version = get_registry(CM_NAME, NAMESPACE, CM_KEY)
+    assert data == {"critical-services": {"a": entry(), "b": entry(), "c": entry(), "d": entry("other")}}
+    assert len(version.split(":")) == 4
+    assert get_registry(CM_NAME, NAMESPACE, CM_KEY)[0] is data
+    assert get_registry_service(CM_NAME, NAMESPACE, CM_KEY, "d") == entry("other")
+    assert get_registry_service(CM_NAME, NAMESPACE, CM_KEY, "missing") is None
+    assert read_registry(CM_NAME, NAMESPACE, CM_KEY) == data
+
+def test_updates_of_a_sharded_registry_patch_only_their_shard(fake_core, monkeypatch):
+    monkeypatch.setattr(configmap_writer, "REGISTRY_SHARDS", 3)
+    fake_core.set(CM_NAME, registry({"a": entry()}))
+    writer = get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY)
+    writer.submit({"b": entry()})
+    fake_core.calls.clear()
+
+    result = writer.submit({"e": entry(), "a": entry()})
+
+    shard = shard_for("e", shard_names(CM_NAME, 3))
+    assert result == {"Update": "Successful", "Successfully Added Services": ["e"],
+                      "Already Existing Services": ["a"]}
+    assert [call for call in fake_core.calls if call[0] != "read"] == [("patch", shard)]
+
+def test_services_left_in_the_base_configmap_are_still_registered(fake_core, monkeypatch):
+    # No RRS_REGISTRY_SHARDS here: the layout was sharded by another replica
+    monkeypatch.setattr(configmap_writer, "REGISTRY_SHARDS", 0)
+    shards = shard_names(CM_NAME, 2)
+    fake_core.set(CM_NAME, {**registry({"legacy": entry()}), MANIFEST_KEY: json.dumps({"shards": shards})})
+    fake_core.set(shard_for("a", shards), registry({"a": entry()}))
+
+    result = get_configmap_writer(CM_NAME, NAMESPACE, CM_KEY).submit({"legacy": entry(), "b": entry()})
+
+    assert result == {"Update": "Successful", "Successfully Added Services": ["b"],
+                      "Already Existing Services": ["legacy"]}
+    assert sorted(get_registry(CM_NAME, NAMESPACE, CM_KEY)[0]["critical-services"]) == ["a", "b", "legacy"]
+    assert sorted(read_registry(CM_NAME, NAMESPACE, CM_KEY)["critical-services"]) == ["a", "b", "legacy"]
+    assert get_registry_service(CM_NAME, NAMESPACE, CM_KEY, "legacy") == entry()
@@ -0,0 +1,149 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Tests of the debounced, diff-only publisher of rrs-mon-dynamic."""
+
+import json
+import pytest
+from resources import status_monitor
+from resources.service_registry import MANIFEST_KEY, shard_for, shard_names
+from conftest import CM_KEY
+
+DYNAMIC_CM = status_monitor.DYNAMIC_CM
+SERVICES = {
+    "foo": {"namespace": "services", "type": "Deployment"},
+    "bar": {"namespace": "services", "type": "DaemonSet"}
+}
+
+def status(value, balanced="true"):
+    return {"namespace": "services", "type": "Deployment", "status": value, "balanced": balanced,
+            "min_replicas_per_zone": 1, "single_zone_risk": False}
+
+class Upstream:
+    """Registry, versions and computed status seen by the monitor."""
+
+    def __init__(self):
+        self.pod_version = 1
+        self.status = {"foo": status("Configured"), "bar": status("Configured")}
+
+    def change(self, **services):
+        self.pod_version += 1
+        self.status = {**self.status, **services}
+
+@pytest.fixture
+def upstream(fake_core, monkeypatch):
+    upstream = Upstream()
+    monkeypatch.setattr(status_monitor, "get_registry", lambda cm_name, cm_namespace, cm_key: (
+        {"critical-services": SERVICES}, "1"))
+    monkeypatch.setattr(status_monitor, "get_k8s_zone_version", lambda: "1")
+    monkeypatch.setattr(status_monitor, "get_pod_index_version", lambda namespace: upstream.pod_version)
+    monkeypatch.setattr(status_monitor, "get_workload_version", lambda namespace, types: "1")
+    monkeypatch.setattr(status_monitor, "compute_status", lambda services: dict(upstream.status))
+    monkeypatch.setattr(status_monitor, "DEBOUNCE_SECONDS", 2)
+    monkeypatch.setattr(status_monitor, "MAX_DELAY_SECONDS", 30)
+    monkeypatch.setattr(status_monitor, "MIN_PATCH_INTERVAL", 10)
+    return upstream
+
+def dynamic(fake, name=DYNAMIC_CM):
+    return json.loads(fake.data(name)[CM_KEY])["critical-services"]
+
+def test_drain_burst_is_published_as_one_patch(fake_core, upstream):
+    fake_core.set(DYNAMIC_CM, {CM_KEY: json.dumps({"critical-services": upstream.status})})
+    monitor = status_monitor.StatusMonitor()
+    monitor.poll(0)
+    monitor.poll(3)
+    assert fake_core.patches() == []
+
+    # Pods of both services go down and come back one by one during the drain
+    for step, value in enumerate(["PartiallyConfigured", "NotConfigured", "PartiallyConfigured"]):
+        upstream.change(foo=status(value, "false"), bar=status(value, "false"))
+        monitor.poll(10 + step * 0.5)
+    monitor.poll(12.5)
+    assert fake_core.patches() == []
+    monitor.poll(13.5)
+
+    assert len(fake_core.patches()) == 1
+    assert dynamic(fake_core)["foo"]["status"] == "PartiallyConfigured"
+    assert dynamic(fake_core)["bar"]["balanced"] == "false"
+
+def test_patches_are_rate_limited(fake_core, upstream):
+    fake_core.set(DYNAMIC_CM, {CM_KEY: json.dumps({"critical-services": {}})})
+    monitor = status_monitor.StatusMonitor()
+    monitor.poll(0)
+    monitor.poll(2)
+    assert len(fake_core.patches()) == 1
+
+    upstream.change(foo=status("NotConfigured"))
+    monitor.poll(3)
+    monitor.poll(6)
+    assert len(fake_core.patches()) == 1
+    monitor.poll(12)
+    assert len(fake_core.patches()) == 2
+    assert dynamic(fake_core)["foo"]["status"] == "NotConfigured"
+
+def test_only_changed_fields_are_merged(fake_core, upstream):
+    existing = {
+        "foo": {**status("Configured"), "extra": "kept"},
+        "bar": status("Configured"),
+        "unmanaged": {"namespace": "other", "type": "Deployment", "status": "Configured"}
+    }
+    fake_core.set(DYNAMIC_CM, {CM_KEY: json.dumps({"critical-services": existing, "note": "kept"}),
+                               "other-key": "kept"})
+    upstream.change(foo=status("NotConfigured"))
+    monitor = status_monitor.StatusMonitor()
+    monitor.poll(0)
+    monitor.poll(2)
+
+    assert len(fake_core.patches()) == 1
+    blob = json.loads(fake_core.data(DYNAMIC_CM)[CM_KEY])
+    assert blob["note"] == "kept"
+    assert blob["critical-services"]["foo"] == {**status("NotConfigured"), "extra": "kept"}
+    assert blob["critical-services"]["bar"] == existing["bar"]
+    assert blob["critical-services"]["unmanaged"] == existing["unmanaged"]
+    assert fake_core.data(DYNAMIC_CM)["other-key"] == "kept"
+
+    # Nothing changed since the last publish: no read, no patch
+    fake_core.calls.clear()
+    upstream.change()
+    monitor.poll(20)
+    monitor.poll(23)
+    assert fake_core.calls == []
+
+def test_sharded_configmap_is_updated_in_the_shard_of_each_service(fake_core, upstream):
+    shards = shard_names(DYNAMIC_CM, 2)
+    fake_core.set(DYNAMIC_CM, {CM_KEY: json.dumps({"critical-services": {}}),
+                               MANIFEST_KEY: json.dumps({"shards": shards})})
+    for shard in shards:
+        fake_core.set(shard, {CM_KEY: json.dumps({"critical-services": {
+            name: {**upstream.status[name], "extra": name} for name in SERVICES if shard_for(name, shards) == shard}})})
+    upstream.change(bar=status("NotConfigured"))
+    monitor = status_monitor.StatusMonitor()
+    monitor.poll(0)
+    monitor.poll(2)
+
+    bar_shard = shard_for("bar", shards)
+    assert [call[1] for call in fake_core.patches()] == [bar_shard]
+    assert dynamic(fake_core, bar_shard)["bar"] == {**status("NotConfigured"), "extra": "bar"}
+    assert dynamic(fake_core, DYNAMIC_CM) == {}
@@ -0,0 +1,78 @@
+#
+# MIT License
+#
+# (C) Copyright [2024-2025] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+"""Tests of the zone balance computed from the running replicas per zone."""
+
+import pytest
+from resources import zone_balance
+from resources.zone_balance import get_service_balance, with_live_balance
+
+ZONES = ("x1", "x2", "x3")
+
+@pytest.mark.parametrize("resource_type, zone_counts, balanced, min_replicas, single_zone_risk", [
+    ("Deployment", {"x1": 1, "x2": 1, "x3": 1}, "true", 1, False),
+    ("Deployment", {"x1": 2, "x2": 1, "x3": 1}, "true", 1, False),
+    ("Deployment", {"x1": 2, "x2": 1}, "false", 0, False),
+    ("Deployment", {"x1": 3, "x2": 1}, "false", 0, False),
+    ("Deployment", {"x1": 1}, "true", 0, True),
+    ("StatefulSet", {"x1": 2}, "false", 0, True),
+    ("Deployment", {}, "false", 0, True),
+    ("DaemonSet", {"x1": 1, "x2": 1, "x3": 1}, "true", 1, False),
+    ("DaemonSet", {"x1": 4, "x2": 1}, "false", 0, False),
+])
+def test_zone_balance(resource_type, zone_counts, balanced, min_replicas, single_zone_risk):
+    assert zone_balance.zone_balance(resource_type, zone_counts, ZONES) == {
+        "balanced": balanced,
+        "min_replicas_per_zone": min_replicas,
+        "single_zone_risk": single_zone_risk
+    }
+
+def test_zones_without_nodes_are_ignored():
+    assert zone_balance.zone_balance("Deployment", {"x1": 1, "gone": 5}, ("x1",))["balanced"] == "true"
+
+def test_service_balance_needs_an_indexed_namespace_and_zones(monkeypatch):
+    counts = {("services", "Deployment", "foo"): {"x1": 1, "x2": 1, "x3": 1}}
+    monkeypatch.setattr(zone_balance, "get_running_zone_counts",
+                        lambda namespace, kind, name: counts.get((namespace, kind, name)))
+
+    assert get_service_balance("services", "Deployment", "foo", ZONES)["balanced"] == "true"
+    assert get_service_balance("other", "Deployment", "foo", ZONES) is None
+    assert get_service_balance("services", "Deployment", "foo", ()) is None
+
+def test_with_live_balance_keeps_the_configured_flag_until_indexed(monkeypatch):
+    monkeypatch.setattr(zone_balance, "topology_zones", lambda: ZONES)
+    monkeypatch.setattr(zone_balance, "get_running_zone_counts",
+                        lambda namespace, kind, name: {"x1": 2} if namespace == "services" else None)
+    services = {
+        "foo": {"namespace": "services", "type": "Deployment", "balanced": "true"},
+        "bar": {"namespace": "unindexed", "type": "Deployment", "balanced": "true"}
+    }
+
+    result = with_live_balance(services)
+
+    assert result["foo"] == {"namespace": "services", "type": "Deployment", "balanced": "false",
+                             "min_replicas_per_zone": 0, "single_zone_risk": True}
+    assert result["bar"] is services["bar"]
+    assert services["foo"]["balanced"] == "true"